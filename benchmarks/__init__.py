@@ -0,0 +1,9 @@
+# flake8: noqa
+from benchmarks.suite import (
+    BASELINE_PATH,
+    compare,
+    environment,
+    load_results,
+    run_benchmarks,
+    save_results,
+)
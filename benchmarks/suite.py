@@ -0,0 +1,295 @@
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from importlib.metadata import version
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from gym_platformer.core import Configuration, write_chunk_file
+from gym_platformer.envs import PlatformerEnv, PlatformerVectorEnv
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+# observation and render settings measured by `bench_step`
+STEP_MODES: dict[str, dict[str, Any]] = {
+    "image": {},
+    "image_pygame": {"render_backend": "pygame"},
+    "image_84_grayscale": {"image_size": (84, 84), "image_color": "grayscale"},
+    "grid": {"obs_mode": "grid"},
+    "state": {"obs_mode": "state"},
+}
+VECTOR_SIZES = (1, 64, 1024, 8192)
+# run by `bench_import` in a new interpreter, which prints the durations
+STARTUP_CODE = """
+import json, time
+start = time.perf_counter()
+from gym_platformer.envs import PlatformerEnv
+imported = time.perf_counter()
+PlatformerEnv(obs_mode="state").reset(seed=0)
+print(json.dumps([imported - start, time.perf_counter() - imported]))
+"""
+# actions mostly running and jumping to the right, to go through the level
+ACTION_PROBS = [0.1, 0.35, 0.05, 0.35, 0.1, 0.05]
+
+
+def _percentiles(durations: np.ndarray, name: str) -> dict[str, float]:
+    p50, p90, p99 = np.percentile(durations, [50, 90, 99]) * 1e3
+    return {f"{name}.p50_ms": p50, f"{name}.p90_ms": p90, f"{name}.p99_ms": p99}
+
+
+def bench_step(mode: str, n_steps: int) -> dict[str, float]:
+    """Measures the steps of an environment.
+
+    Args:
+        mode (str): Key of the environment settings in `STEP_MODES`.
+        n_steps (int): Number of steps measured.
+
+    Returns:
+        dict[str, float]: Steps per second, from the median step duration so
+            that pauses of the machine do not count, and step latency
+            percentiles.
+    """
+    env = PlatformerEnv(ep_duration=500, **STEP_MODES[mode])
+    actions = np.random.default_rng(0).choice(6, size=n_steps, p=ACTION_PROBS).tolist()
+    durations = np.empty(n_steps)
+    env.reset()
+    for i, action in enumerate(actions):
+        start = time.perf_counter()
+        _, _, terminated, _, _ = env.step(action)
+        durations[i] = time.perf_counter() - start
+        if terminated:
+            env.reset()
+    env.close()
+    name = f"step.{mode}"
+    return {f"{name}.steps_per_sec": 1 / np.median(durations), **_percentiles(durations, name)}
+
+
+def bench_reset(n_resets: int) -> dict[str, float]:
+    """Measures the resets of an environment after a few steps.
+
+    Args:
+        n_resets (int): Number of resets measured.
+
+    Returns:
+        dict[str, float]: Reset latency percentiles.
+    """
+    env = PlatformerEnv()
+    durations = np.empty(n_resets)
+    env.reset()
+    for i in range(n_resets):
+        for _ in range(5):
+            env.step(3)
+        start = time.perf_counter()
+        env.reset()
+        durations[i] = time.perf_counter() - start
+    env.close()
+    return _percentiles(durations, "reset")
+
+
+def bench_import(n_runs: int) -> dict[str, float]:
+    """Measures the cold start of headless workers, each in a new interpreter.
+
+    Args:
+        n_runs (int): Number of interpreters started.
+
+    Returns:
+        dict[str, float]: Latency percentiles of the import of the
+            environments and of the creation and first reset of an
+            environment after it.
+    """
+    durations = np.empty((n_runs, 2))
+    for i in range(n_runs):
+        output = subprocess.run(  # noqa: S603
+            [sys.executable, "-c", STARTUP_CODE], capture_output=True, check=True, text=True
+        ).stdout
+        durations[i] = json.loads(output)
+    return {**_percentiles(durations[:, 0], "import"), **_percentiles(durations[:, 1], "startup")}
+
+
+def distinct_chunks(n_chunks: int) -> dict[str, list[str]]:
+    """Builds flat chunks which all differ, by the blocks of their top rows.
+
+    The top rows hold the bits of the chunk index and their complement, so
+    that every chunk has as many blocks and takes as much memory.
+
+    Args:
+        n_chunks (int): Number of chunks, besides the `"init"` one.
+
+    Returns:
+        dict[str, list[str]]: The rows of the chunks by name.
+    """
+    cfg = Configuration()
+    # narrow chunks, to go through many of them in a short episode
+    width, n_rows = 4, 4
+    ground = ["W" * (width - 1) + "E"]
+    library = {"init": [" " * width] * (cfg.CHUNK_HEIGHT - 1) + ground}
+    for i in range(n_chunks):
+        bits = f"{i:0{width * n_rows}b}"
+        top = [
+            bits[row : row + width].translate(str.maketrans(table, " W"))
+            for table in ("01", "10")
+            for row in range(0, width * n_rows, width)
+        ]
+        library[f"chunk_{i}"] = top + [" " * width] * (cfg.CHUNK_HEIGHT - len(top) - 1) + ground
+    return library
+
+
+def bench_memory(n_steps: int, level: str, obs_mode: str = "state") -> dict[str, float]:
+    """Measures the memory kept by an environment along an episode.
+
+    Args:
+        n_steps (int): Number of steps of the episode.
+        level (str): `"long"` for a long episode through the fixed level,
+            `"infinite"` for chunks generated randomly without an end
+            (`cfg.RANDOM_GEN`) and `"endless"` for random chunks streamed
+            from an endless level, drawn from as many chunks as steps.
+        obs_mode (str): Observation mode of the environment. Default to
+            `"state"`.
+
+    Returns:
+        dict[str, float]: Growth of the memory allocated between the middle
+            and the end of the episode.
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        chunk_file = None
+        if level == "endless":
+            # every chunk is new, the memory of the ones passed must be given back
+            chunk_file = write_chunk_file(Path(folder, "chunks.bin"), distinct_chunks(n_steps))
+        env = PlatformerEnv(
+            ep_duration=float("inf"),
+            obs_mode=obs_mode,
+            levels="random" if level == "endless" else "fixed",
+            chunk_file=chunk_file,
+            endless=level == "endless",
+        )
+        env.cfg.RANDOM_GEN = level == "infinite"
+        actions = np.random.default_rng(0).choice(6, size=n_steps, p=ACTION_PROBS).tolist()
+        env.reset()
+        tracemalloc.start()
+        for i, action in enumerate(actions):
+            if i == n_steps // 2:
+                start = tracemalloc.get_traced_memory()[0]
+            _, _, terminated, _, _ = env.step(action)
+            if terminated:
+                env.reset()
+        end = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        env.close()
+    name = level if obs_mode == "state" else f"{level}_{obs_mode}"
+    return {f"memory.{name}.growth_bytes": float(end - start)}
+
+
+def bench_vector(num_envs: int, n_steps: int) -> dict[str, float]:
+    """Measures the steps of the vectorized environment.
+
+    Args:
+        num_envs (int): Number of episodes played in parallel.
+        n_steps (int): Number of steps measured.
+
+    Returns:
+        dict[str, float]: Episode steps per second over all the episodes, from
+            the median step duration.
+    """
+    env = PlatformerVectorEnv(num_envs=num_envs, ep_duration=500)
+    actions = np.random.default_rng(0).choice(6, size=(n_steps, num_envs), p=ACTION_PROBS)
+    durations = np.empty(n_steps)
+    env.reset()
+    for i, step_actions in enumerate(actions):
+        start = time.perf_counter()
+        env.step(step_actions)
+        durations[i] = time.perf_counter() - start
+    return {f"vector.{num_envs}.steps_per_sec": num_envs / np.median(durations)}
+
+
+def environment() -> dict[str, Any]:
+    """Gets the versions of the software measured and the host measuring it.
+
+    Returns:
+        dict[str, Any]: The versions and the host, as recorded by `run_benchmarks`.
+    """
+    return {
+        "versions": {
+            "python": platform.python_version(),
+            **{name: version(name) for name in ("gym_platformer", "gymnasium", "numpy", "pygame")},
+        },
+        "host": {
+            "node": platform.node(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "system": platform.system(),
+        },
+    }
+
+
+def run_benchmarks(quick: bool = False) -> dict[str, Any]:
+    """Runs every benchmark.
+
+    Args:
+        quick (bool): Whether to measure fewer steps, less precisely.
+
+    Returns:
+        dict[str, Any]: The versions of the software measured, the host and
+            the metrics.
+    """
+    n_steps = 1_000 if quick else 10_000
+    metrics: dict[str, float] = {}
+    for mode in STEP_MODES:
+        metrics.update(bench_step(mode, n_steps))
+    metrics.update(bench_reset(n_steps // 10))
+    metrics.update(bench_import(5 if quick else 20))
+    for level in ("long", "infinite", "endless"):
+        metrics.update(bench_memory(n_steps, level))
+    metrics.update(bench_memory(n_steps, "endless", obs_mode="image"))
+    for num_envs in VECTOR_SIZES:
+        metrics.update(bench_vector(num_envs, n_steps // 10))
+    return {**environment(), "metrics": metrics}
+
+
+def compare(
+    metrics: dict[str, float],
+    baseline: dict[str, float],
+    tolerance: float = 0.3,
+    memory_slack: float = 2**20,
+) -> list[str]:
+    """Compares metrics with baseline ones.
+
+    Args:
+        metrics (dict[str, float]): The metrics measured.
+        baseline (dict[str, float]): The baseline metrics.
+        tolerance (float): Relative slowdown allowed. Defaults to 0.3.
+        memory_slack (float): Memory growth allowed beyond the baseline one,
+            in bytes. Defaults to 1 MiB.
+
+    Returns:
+        list[str]: One message per metric worse than its baseline.
+    """
+    regressions = []
+    for name, value in metrics.items():
+        if name not in baseline:
+            continue
+        reference = baseline[name]
+        if name.endswith("_per_sec"):
+            worse = value < reference * (1 - tolerance)
+        elif name.endswith("_ms"):
+            worse = value > reference * (1 + tolerance)
+        else:
+            worse = value > reference + memory_slack
+        if worse:
+            regressions.append(f"{name}: {value:.6g} (baseline {reference:.6g})")
+    return regressions
+
+
+def save_results(results: dict[str, Any], path: Path) -> None:
+    """Writes benchmark results as JSON."""
+    path.write_text(json.dumps(results, indent=2) + "\n")
+
+
+def load_results(path: Path) -> dict[str, Any]:
+    """Reads benchmark results written by `save_results`."""
+    return json.loads(path.read_text())
@@ -1,4 +1,7 @@
 import argparse
+import json
+import sys
+from pathlib import Path
 
 import gymnasium as gym
 import pygame
@@ -12,6 +15,34 @@ def parse_args() -> argparse.Namespace:
         default="manual",
         help="manual: keyboard controls, auto: random actions",
     )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="measure the speed of the environments instead of playing",
+    )
+    parser.add_argument(
+        "--benchmark-output",
+        type=Path,
+        default=None,
+        help="JSON file the benchmark results are written to",
+    )
+    parser.add_argument(
+        "--benchmark-baseline",
+        type=Path,
+        default=None,
+        help="JSON file of the results to compare with (default: benchmarks/baseline.json)",
+    )
+    parser.add_argument(
+        "--benchmark-tolerance",
+        type=float,
+        default=0.3,
+        help="relative slowdown allowed before a metric is reported as a regression",
+    )
+    parser.add_argument(
+        "--benchmark-quick",
+        action="store_true",
+        help="measure fewer steps, less precisely",
+    )
     return parser.parse_args()
 
 
@@ -33,8 +64,29 @@ def get_manual_action(keys: pygame.key.ScancodeWrapper, cfg: object) -> int:
     return 5
 
 
+def benchmark(args: argparse.Namespace) -> int:
+    from benchmarks import BASELINE_PATH, compare, load_results, run_benchmarks, save_results
+
+    results = run_benchmarks(quick=args.benchmark_quick)
+    if args.benchmark_output is not None:
+        save_results(results, args.benchmark_output)
+    else:
+        sys.stdout.write(json.dumps(results, indent=2) + "\n")
+
+    baseline_path = args.benchmark_baseline or BASELINE_PATH
+    if not baseline_path.exists():
+        return 0
+    baseline = load_results(baseline_path)["metrics"]
+    regressions = compare(results["metrics"], baseline, args.benchmark_tolerance)
+    for regression in regressions:
+        sys.stderr.write(f"regression: {regression}\n")
+    return 1 if regressions else 0
+
+
 if __name__ == "__main__":
     args = parse_args()
+    if args.benchmark:
+        sys.exit(benchmark(args))
 
     env = gym.make("gym_platformer:platformer-v0", render_mode="human", ep_duration=float("inf"))
     env.reset()
@@ -4,3 +4,10 @@ register(
     id="platformer-v0",
     entry_point="gym_platformer.envs:PlatformerEnv",
 )
+# state observations only, which `make_vec` steps with the batched physics
+register(
+    id="platformer-state-v0",
+    entry_point="gym_platformer.envs:PlatformerEnv",
+    vector_entry_point="gym_platformer.envs:PlatformerVectorEnv",
+    kwargs={"obs_mode": "state"},
+)
@@ -1,5 +1,9 @@
 # flake8: noqa
+from .batch_player import BatchPlayer
 from .block import Block
+from .chunk_file import ChunkFile, write_chunk_file
 from .config import Configuration
-from .map import Map
+from .level_pack import EndlessLevel, LevelPack, generate_level_pack
+from .map import Map, MapState
 from .player import Player
+from .rasterizer import Rasterizer
@@ -0,0 +1,230 @@
+import numpy as np
+
+from .config import Configuration
+from .player import Player
+
+
+def round_coor(values: np.ndarray) -> np.ndarray:
+    """Rounds coordinates the way `pygame.Rect` does (half away from zero).
+
+    Args:
+        values (np.ndarray): Float coordinates.
+
+    Returns:
+        np.ndarray: The rounded coordinates as integers.
+    """
+    truncated = np.trunc(values)
+    away = np.abs(values - truncated) >= 0.5
+    return (truncated + np.where(away, np.sign(values), 0.0)).astype(np.int64)
+
+
+class BatchPlayer:
+    metadata = Player.metadata
+
+    def __init__(self, cfg: Configuration, num_players: int) -> None:
+        """Struct-of-arrays version of `Player` stepping many players at once.
+
+        Players live in a level described by an occupancy grid of shape
+        `(columns, cfg.CHUNK_HEIGHT)` whose column `0` starts at world x `0`.
+        Each player has its own camera offset, the world x of the left side of
+        the screen, so `x` and `y` are the same screen coordinates as
+        `Player.rect`.
+
+        Args:
+            cfg (Configuration): The configuration of the environment.
+            num_players (int): Number of players to simulate.
+        """
+        self.cfg = cfg
+        self.num_players = num_players
+        self.y_origin = (cfg.VISIBILITY_Y - 1) * cfg.CHUNK_HEIGHT * cfg.BLOCK_HEIGHT
+        self.x = np.zeros(num_players, dtype=np.int64)
+        self.y = np.zeros(num_players, dtype=np.int64)
+        self.x_speed = np.zeros(num_players, dtype=np.float64)
+        self.y_speed = np.zeros(num_players, dtype=np.float64)
+        self.offset = np.zeros(num_players, dtype=np.int64)
+        self.reset()
+
+    def reset(self, mask: np.ndarray | None = None) -> None:
+        """Puts players back at the start position.
+
+        Args:
+            mask (np.ndarray, optional): Boolean mask or indexes of the players
+                to reset. Defaults to all players.
+        """
+        if mask is None:
+            mask = slice(None)
+        self.x[mask] = self.cfg.START_X
+        self.y[mask] = self.cfg.START_Y
+        self.x_speed[mask] = 0.0
+        self.y_speed[mask] = 0.0
+        self.offset[mask] = 0
+
+    def slowdown(self, idx: np.ndarray) -> None:
+        """Slows the selected players down.
+
+        Args:
+            idx (np.ndarray): Indexes of the players to slow down.
+        """
+        slowed = self.x_speed[idx] * self.cfg.SLOWDOWN_X
+        self.x_speed[idx] = np.where(np.abs(slowed) < 1, 0.0, np.trunc(slowed))
+
+    def collisions(self, x_speed: np.ndarray, y_speed: np.ndarray, grid: np.ndarray) -> None:
+        """Handling of collisions when moving the players.
+
+        Cells are visited column by column and top to bottom within a column,
+        which is the order of `Map.blocks`, so that players pushed out of a
+        block end up exactly where `Player.collisions` would put them.
+
+        Args:
+            x_speed (np.ndarray): Horizontal speed of the players.
+            y_speed (np.ndarray): Vertical speed of the players.
+            grid (np.ndarray): Occupancy grid of the level.
+        """
+        cfg = self.cfg
+        n_cols, n_rows = grid.shape
+        idx = np.flatnonzero((x_speed != 0) | (y_speed != 0))
+        if idx.size == 0:
+            return
+        x_speed = x_speed[idx]
+        y_speed = y_speed[idx]
+        left = self.x[idx] + self.offset[idx]
+        top = self.y[idx]
+        col = np.floor_divide(left, cfg.BLOCK_WIDTH)
+        active = np.ones(idx.size, dtype=bool)
+
+        while True:
+            active &= (col * cfg.BLOCK_WIDTH < left + cfg.PLAYER_WIDTH) & (col < n_cols)
+            if not active.any():
+                break
+            valid = active & (col >= 0)
+            column = grid[np.clip(col, 0, n_cols - 1)]
+            block_left = col * cfg.BLOCK_WIDTH
+            row, last_row = self._row_range(top[active], n_rows)
+            while row <= last_row:
+                block_top = self.y_origin + row * cfg.BLOCK_HEIGHT
+                hit = (
+                    valid
+                    & column[:, row]
+                    & (left < block_left + cfg.BLOCK_WIDTH)
+                    & (left + cfg.PLAYER_WIDTH > block_left)
+                    & (top < block_top + cfg.BLOCK_HEIGHT)
+                    & (top + cfg.PLAYER_HEIGHT > block_top)
+                )
+                if hit.any():
+                    right = hit & (x_speed > 0)
+                    left[right] = block_left[right] - cfg.PLAYER_WIDTH
+                    back = hit & (x_speed < 0)
+                    left[back] = block_left[back] + cfg.BLOCK_WIDTH
+                    self.slowdown(idx[right | back])
+
+                    down = hit & (y_speed > 0)
+                    top[down] = block_top - cfg.PLAYER_HEIGHT
+                    up = hit & (y_speed < 0)
+                    top[up] = block_top + cfg.BLOCK_HEIGHT
+                    self.y_speed[idx[down | up]] = 0.0
+                    # being pushed down may bring lower rows into reach
+                    last_row = max(last_row, self._row_range(top[active], n_rows)[1])
+                row += 1
+            col += 1
+
+        self.x[idx] = left - self.offset[idx]
+        self.y[idx] = top
+
+    def _row_range(self, top: np.ndarray, n_rows: int) -> tuple[int, int]:
+        """Returns the first and last grid rows overlapped by any of the players."""
+        first = (int(top.min()) - self.y_origin) // self.cfg.BLOCK_HEIGHT
+        last = (
+            int(top.max()) + self.cfg.PLAYER_HEIGHT - 1 - self.y_origin
+        ) // self.cfg.BLOCK_HEIGHT
+        return max(first, 0), min(last, n_rows - 1)
+
+    def ground(self, grid: np.ndarray) -> np.ndarray:
+        """Checks whether the players are on the ground or not.
+
+        Args:
+            grid (np.ndarray): Occupancy grid of the level.
+
+        Returns:
+            np.ndarray: Boolean mask of the players standing on a block.
+        """
+        cfg = self.cfg
+        n_cols, n_rows = grid.shape
+        left = self.x + self.offset
+        below = self.y + cfg.PLAYER_HEIGHT - self.y_origin
+        row = below // cfg.BLOCK_HEIGHT
+        on_row = (below % cfg.BLOCK_HEIGHT == 0) & (row >= 0) & (row < n_rows)
+        row = np.clip(row, 0, n_rows - 1)
+        col = np.floor_divide(left, cfg.BLOCK_WIDTH)
+        result = on_row & (col >= 0) & (col < n_cols) & grid[np.clip(col, 0, n_cols - 1), row]
+        # a player not aligned on the grid also stands on the next column
+        col += 1
+        straddling = on_row & (left % cfg.BLOCK_WIDTH != 0) & (col >= 0) & (col < n_cols)
+        return result | (straddling & grid[np.clip(col, 0, n_cols - 1), row])
+
+    def update_speed(self, actions: np.ndarray, grid: np.ndarray) -> None:
+        """Updates players speed on horizontal and vertical axis.
+
+        Args:
+            actions (np.ndarray): One valid action index per player (see
+                metadata for available indexes).
+            grid (np.ndarray): Occupancy grid of the level.
+        """
+        cfg = self.cfg
+        # HORIZONTAL MOVEMENTS
+
+        go_left = (actions == 0) | (actions == 2)
+        go_right = (actions == 1) | (actions == 3)
+        idle = ~(go_left | go_right)
+        braking = (go_left & (self.x_speed > 0)) | (go_right & (self.x_speed < 0))
+        self.x_speed[go_left & ~braking] -= cfg.ACCELERATION_X
+        self.x_speed[go_right & ~braking] += cfg.ACCELERATION_X
+        self.x_speed[idle] -= np.sign(self.x_speed[idle])
+        self.slowdown(np.flatnonzero(braking))
+
+        # VERTICAL MOVEMENTS
+
+        on_ground = self.ground(grid)
+        # gravity
+        self.y_speed[~on_ground] += cfg.ACCELERATION_Y
+        jump = on_ground & ((actions == 2) | (actions == 3) | (actions == 4))
+        self.y_speed[jump] -= float(cfg.SPEED_Y)
+
+        # x speed limit
+        np.clip(self.x_speed, -cfg.SPEED_X, cfg.SPEED_X, out=self.x_speed)
+
+    def update_coor(self, grid: np.ndarray) -> None:
+        """Moves the players.
+
+        Args:
+            grid (np.ndarray): Occupancy grid of the level.
+        """
+        cfg = self.cfg
+        self.x = round_coor(self.x + self.x_speed)
+
+        # correcting not to get past the middle of the screen
+        self.x[self.x > cfg.SIZE_X / 2] = round_coor(np.float64(cfg.SIZE_X / 2))
+
+        # correcting not to get past the left side of the screen
+        past_left = self.x < 0
+        self.x[past_left] = 0
+        self.x_speed[past_left] = 0.0
+
+        # moves the camera when a player reaches the middle of the screen
+        scrolling = (self.x == cfg.SIZE_X / 2) & (self.x_speed > 0)
+        self.offset[scrolling] += round_coor(self.x_speed[scrolling])
+
+        self.collisions(self.x_speed, np.zeros_like(self.y_speed), grid)
+
+        self.y = round_coor(self.y + self.y_speed)
+        self.collisions(np.zeros_like(self.x_speed), self.y_speed, grid)
+
+    def step(self, actions: np.ndarray, grid: np.ndarray) -> None:
+        """Updates players state according to their actions.
+
+        Args:
+            actions (np.ndarray): One valid action index per player (see
+                metadata for available indexes).
+            grid (np.ndarray): Occupancy grid of the level.
+        """
+        self.update_speed(actions, grid)
+        self.update_coor(grid)
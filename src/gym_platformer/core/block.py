@@ -1,6 +1,5 @@
-import pygame
-
 from .config import Configuration
+from .rect import Rect
 
 
 class Block:
@@ -22,16 +21,6 @@ class Block:
         block_type: str = "default",
     ) -> None:
         # applies coordinates and sizes
-        self.rect = pygame.Rect(x_coor, y_coor, cfg.BLOCK_WIDTH, cfg.BLOCK_HEIGHT)
+        self.rect = Rect(x_coor, y_coor, cfg.BLOCK_WIDTH, cfg.BLOCK_HEIGHT)
         # sets block attributes
         self.block_type = block_type
-
-    def move(self, x_speed: float, y_speed: float) -> None:
-        """Moves the blocks relatively.
-
-        Args:
-            x_speed (float): Speed on x axis.
-            y_speed (float): Speed on y axis.
-        """
-        self.rect.x += x_speed
-        self.rect.y += y_speed
@@ -0,0 +1,231 @@
+import os
+from collections.abc import Iterator, Mapping, Sequence
+from pathlib import Path
+
+import numpy as np
+
+# File layout, little-endian, every section following the previous one:
+#   header    _HEADER
+#   index     one _index_dtype record per chunk, sorted by name
+#   levels    n_levels + 1 uint64 offsets into the level chunks
+#   level     uint32 index of each chunk of each level
+#   tiles     one uint8 per tile, column by column, see TILE_CHARS
+MAGIC = b"GPCHUNKS"
+VERSION = 1
+# character of each tile code
+TILE_CHARS = " WE"
+
+_HEADER = np.dtype(
+    [
+        ("magic", "S8"),
+        ("version", "<u4"),
+        ("chunk_height", "<u4"),
+        ("name_size", "<u4"),
+        ("n_chunks", "<u8"),
+        ("n_levels", "<u8"),
+        ("n_level_chunks", "<u8"),
+    ]
+)
+
+
+def _index_dtype(name_size: int) -> np.dtype:
+    return np.dtype([("name", f"S{name_size}"), ("offset", "<u8"), ("width", "<u4")])
+
+
+def write_chunk_file(
+    path: str | os.PathLike,
+    chunks: Mapping[str, Sequence[str]],
+    levels: Sequence[Sequence[str]] = (),
+) -> Path:
+    """Writes chunks and levels into a chunk file, see `ChunkFile`.
+
+    Args:
+        path (str | os.PathLike): The file the chunks are written to.
+        chunks (Mapping[str, Sequence[str]]): The rows of each chunk, by name,
+            e.g. `gym_platformer.core.chunks.chunks`.
+        levels (Sequence[Sequence[str]]): The chunk names of each level.
+            Defaults to no level.
+
+    Returns:
+        Path: The path of the file.
+    """
+    names = sorted(chunks, key=lambda name: name.encode())
+    heights = {len(chunks[name]) for name in names}
+    if len(heights) > 1:
+        raise ValueError(f"chunks have different heights {sorted(heights)}.")
+    chunk_height = heights.pop() if heights else 0
+    name_size = max((len(name.encode()) for name in names), default=1)
+    index = np.zeros(len(names), dtype=_index_dtype(name_size))
+    codes = {char: code for code, char in enumerate(TILE_CHARS)}
+    tiles = []
+    offset = 0
+    for i, name in enumerate(names):
+        rows = chunks[name]
+        if any(len(row) != len(rows[0]) for row in rows) or any(
+            char not in codes for row in rows for char in row
+        ):
+            raise ValueError(f"chunk {name} is invalid.")
+        # indexed by [column, row] like `Map.grid`
+        chunk_tiles = np.array([[codes[char] for char in row] for row in rows], dtype=np.uint8).T
+        index[i] = (name.encode(), offset, len(rows[0]))
+        tiles.append(chunk_tiles.tobytes())
+        offset += chunk_tiles.size
+
+    positions = {name: i for i, name in enumerate(names)}
+    unknown = {name for level in levels for name in level} - positions.keys()
+    if unknown:
+        raise ValueError(f"levels use unknown chunks {sorted(unknown)}.")
+    level_offsets = np.zeros(len(levels) + 1, dtype="<u8")
+    level_offsets[1:] = np.cumsum([len(level) for level in levels])
+    level_chunks = np.array([positions[name] for level in levels for name in level], dtype="<u4")
+
+    header = np.array(
+        (
+            MAGIC,
+            VERSION,
+            chunk_height,
+            index.dtype["name"].itemsize,
+            len(names),
+            len(levels),
+            len(level_chunks),
+        ),
+        dtype=_HEADER,
+    )
+    path = Path(path)
+    with path.open("wb") as file:
+        for section in (header, index, level_offsets, level_chunks):
+            file.write(section.tobytes())
+        file.writelines(tiles)
+    return path
+
+
+class _ChunkNames(Sequence[str]):
+    """Names of the chunks of a `ChunkFile`, read on demand and pickled as its path."""
+
+    def __init__(self, names: np.ndarray, path: Path) -> None:
+        self._names = names
+        self._path = path
+
+    def __reduce__(self) -> tuple:
+        """Pickles the names as the path of their file."""
+        return _file_names, (self._path,)
+
+    def __len__(self) -> int:
+        """Gets the number of chunks."""
+        return len(self._names)
+
+    def __getitem__(self, index: int) -> str:
+        """Gets the name of a chunk."""
+        return self._names[index].decode()
+
+    def index(self, name: str, *args: int) -> int:
+        """Gets the position of a chunk, found by bisection."""
+        encoded = name.encode()
+        position = int(np.searchsorted(self._names, encoded))
+        if position == len(self._names) or self._names[position] != encoded:
+            raise ValueError(f"{name} is not a chunk.")
+        return position
+
+
+class ChunkFile(Mapping[str, tuple[str, ...]]):
+    def __init__(self, path: str | os.PathLike) -> None:
+        """Chunks and levels of a file written by `write_chunk_file`.
+
+        The file is memory-mapped, only its header being read when opened, so
+        chunks are read from disk when first asked for and the pages of the
+        file are shared by every process using it. Chunks are found by
+        bisection on the index, sorted by name.
+
+        Args:
+            path (str | os.PathLike): The chunk file.
+        """
+        self.path = Path(path)
+        data = np.memmap(self.path, dtype=np.uint8, mode="r")
+        header = data[: _HEADER.itemsize].view(_HEADER)[0]
+        if header["magic"] != MAGIC or header["version"] != VERSION:
+            raise ValueError(f"{self.path} is not a chunk file of version {VERSION}.")
+        self.chunk_height = int(header["chunk_height"])
+        n_chunks, n_levels = int(header["n_chunks"]), int(header["n_levels"])
+        index_dtype = _index_dtype(int(header["name_size"]))
+        start = _HEADER.itemsize
+        sections = {}
+        for name, dtype, size in (
+            ("index", index_dtype, n_chunks),
+            ("level_offsets", np.dtype("<u8"), n_levels + 1),
+            ("level_chunks", np.dtype("<u4"), int(header["n_level_chunks"])),
+        ):
+            sections[name] = data[start : start + size * dtype.itemsize].view(dtype)
+            start += size * dtype.itemsize
+        self._index = sections["index"]
+        self._level_offsets = sections["level_offsets"]
+        self._level_chunks = sections["level_chunks"]
+        self._tiles = data[start:]
+        self.names: Sequence[str] = _ChunkNames(self._index["name"], self.path)
+
+    def __len__(self) -> int:
+        """Gets the number of chunks."""
+        return len(self._index)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterates over the chunk names."""
+        return iter(self.names)
+
+    def __contains__(self, name: object) -> bool:
+        """Tells whether a chunk is in the file."""
+        if not isinstance(name, str):
+            return False
+        try:
+            self.names.index(name)
+        except ValueError:
+            return False
+        return True
+
+    def __getitem__(self, name: str) -> tuple[str, ...]:
+        """Reads the rows of a chunk."""
+        try:
+            position = self.names.index(name)
+        except ValueError:
+            raise KeyError(name) from None
+        return self.rows(position)
+
+    def rows(self, position: int) -> tuple[str, ...]:
+        """Reads the rows of the chunk at a position of `names`."""
+        offset, width = int(self._index[position]["offset"]), int(self._index[position]["width"])
+        tiles = self._tiles[offset : offset + width * self.chunk_height]
+        chars = np.array(list(TILE_CHARS))[tiles.reshape(width, self.chunk_height).T]
+        return tuple("".join(row) for row in chars)
+
+    @property
+    def n_levels(self) -> int:
+        """Number of levels of the file."""
+        return len(self._level_offsets) - 1
+
+    def level(self, index: int) -> list[str]:
+        """Gets the chunk names of a level of the file."""
+        index = range(self.n_levels)[index]
+        start, stop = self._level_offsets[index], self._level_offsets[index + 1]
+        return [self.names[i] for i in self._level_chunks[start:stop]]
+
+
+# chunk files opened by the process, by path
+_files: dict[Path, ChunkFile] = {}
+
+
+def open_chunk_file(path: str | os.PathLike) -> ChunkFile:
+    """Opens a chunk file, once per process.
+
+    Args:
+        path (str | os.PathLike): The chunk file.
+
+    Returns:
+        ChunkFile: The chunk file, shared by the next calls with the same path.
+    """
+    key = Path(path).resolve()
+    chunk_file = _files.get(key)
+    if chunk_file is None:
+        chunk_file = _files[key] = ChunkFile(key)
+    return chunk_file
+
+
+def _file_names(path: Path) -> Sequence[str]:
+    return open_chunk_file(path).names
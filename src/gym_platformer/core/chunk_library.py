@@ -0,0 +1,187 @@
+from collections import OrderedDict
+from collections.abc import Hashable, Iterator, Mapping, Sequence
+from typing import Generic, NamedTuple, TypeVar
+
+import numpy as np
+
+from .chunk_file import open_chunk_file
+from .chunks import chunks
+from .config import Configuration
+
+
+class CompiledChunk(NamedTuple):
+    """A chunk turned into arrays, coordinates relative to its top left corner.
+
+    Blocks are listed column by column, top to bottom within a column, which is
+    the order `Map` loads them in. Pickling only keeps the rows and the block
+    size, the chunk being compiled again (or taken from the cache) when loaded.
+    """
+
+    rows: tuple[str, ...]
+    block_size: tuple[int, int]
+    width: int
+    tiles: np.ndarray
+    block_x: tuple[int, ...]
+    block_y: tuple[int, ...]
+    block_end: tuple[bool, ...]
+    end_x: tuple[int, ...]
+
+    def __reduce__(self) -> tuple:
+        """Pickles the chunk as the arguments to compile it."""
+        return _compile, (self.rows, *self.block_size)
+
+
+# number of chunks kept by the caches, well beyond the chunks seen by a camera
+CACHE_SIZE = 64
+
+V = TypeVar("V")
+
+
+class ChunkCache(Generic[V]):
+    def __init__(self, maxsize: int = CACHE_SIZE) -> None:
+        """Values of the chunks used last, the least recently used one being dropped.
+
+        Keeps the memory of the caches constant in endless levels, which go
+        through any number of chunks. A dropped value is built again when
+        needed, while the chunks in use keep theirs.
+
+        Args:
+            maxsize (int): Number of values kept. Default to `CACHE_SIZE`.
+        """
+        self.maxsize = maxsize
+        self._values: OrderedDict[Hashable, V] = OrderedDict()
+
+    def get(self, key: Hashable) -> V | None:
+        """Gets the value of a key, None if it is not kept."""
+        value = self._values.get(key)
+        if value is not None:
+            self._values.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: V) -> V:
+        """Keeps the value of a key, dropping the least recently used one if full."""
+        self._values[key] = value
+        self._values.move_to_end(key)
+        if len(self._values) > self.maxsize:
+            self._values.popitem(last=False)
+        return value
+
+    def __iter__(self) -> Iterator[Hashable]:
+        """Iterates over the keys, the least recently used one first."""
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        """Gets the number of values kept."""
+        return len(self._values)
+
+
+# chunks compiled last, shared by every map of the process
+_compiled: ChunkCache[CompiledChunk] = ChunkCache()
+_libraries: dict[tuple[str | None, int, int], "ChunkLibrary"] = {}
+
+
+def compile_chunk(rows: Sequence[str], cfg: Configuration) -> CompiledChunk:
+    """Compiles a chunk for the block geometry of a configuration.
+
+    Args:
+        rows (Sequence[str]): The rows of the chunk.
+        cfg (Configuration): The configuration of the environment.
+
+    Returns:
+        CompiledChunk: The compiled chunk, cached for the next calls.
+    """
+    return _compile(tuple(rows), cfg.BLOCK_WIDTH, cfg.BLOCK_HEIGHT)
+
+
+def _compile(rows: tuple[str, ...], block_width: int, block_height: int) -> CompiledChunk:
+    key = (rows, block_width, block_height)
+    compiled = _compiled.get(key)
+    if compiled is None:
+        # indexed by [column, row] like `Map.grid`
+        tiles = np.array([[char in "WE" for char in row] for row in rows], dtype=bool).T
+        tiles = tiles.reshape(len(rows[0]), len(rows))
+        tiles.flags.writeable = False
+        cols, block_rows = np.nonzero(tiles)
+        block_end = tuple(rows[row][col] == "E" for col, row in zip(cols, block_rows, strict=True))
+        block_x = tuple((cols * block_width).tolist())
+        compiled = CompiledChunk(
+            rows=rows,
+            block_size=(block_width, block_height),
+            width=len(rows[0]) * block_width,
+            tiles=tiles,
+            block_x=block_x,
+            block_y=tuple((block_rows * block_height).tolist()),
+            block_end=block_end,
+            end_x=tuple(x for x, end in zip(block_x, block_end, strict=True) if end),
+        )
+        _compiled.put(key, compiled)
+    return compiled
+
+
+class ChunkLibrary(Mapping[str, CompiledChunk]):
+    def __init__(
+        self, source: Mapping[str, Sequence[str]], block_width: int, block_height: int
+    ) -> None:
+        """Chunks compiled for a block size when asked for, the ones used last being kept.
+
+        Args:
+            source (Mapping[str, Sequence[str]]): The rows of the chunks by
+                name, `gym_platformer.core.chunks.chunks` or a `ChunkFile`.
+            block_width (int): Width of the blocks.
+            block_height (int): Height of the blocks.
+        """
+        self.source = source
+        self.block_size = (block_width, block_height)
+        # names in a sequence, to draw chunks at random without listing them
+        self.names: Sequence[str] = getattr(source, "names", None) or list(source)
+        # chunks compiled last, the library may hold far more than a level uses
+        self._layouts: ChunkCache[CompiledChunk] = ChunkCache()
+
+    def __getitem__(self, name: str) -> CompiledChunk:
+        """Gets a compiled chunk, compiling it on the first call."""
+        layout = self._layouts.get(name)
+        if layout is None:
+            layout = self._layouts.put(name, _compile(tuple(self.source[name]), *self.block_size))
+        return layout
+
+    def __contains__(self, name: object) -> bool:
+        """Tells whether a chunk is in the library, without compiling it."""
+        return name in self.source
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterates over the chunk names."""
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        """Gets the number of chunks."""
+        return len(self.names)
+
+
+def chunk_library(cfg: Configuration) -> ChunkLibrary:
+    """Gets the chunks of a configuration compiled for its block size.
+
+    The chunks are the ones of `cfg.CHUNK_FILE` if set, otherwise the ones of
+    `gym_platformer.core.chunks`, which are all compiled on the first call.
+
+    Args:
+        cfg (Configuration): The configuration of the environment.
+
+    Returns:
+        ChunkLibrary: The compiled chunks by name, shared by the calls with
+            the same chunks and block size.
+    """
+    source = chunks if cfg.CHUNK_FILE is None else open_chunk_file(cfg.CHUNK_FILE)
+    if cfg.CHUNK_FILE is not None and source.chunk_height != cfg.CHUNK_HEIGHT:
+        raise ValueError(
+            f"chunks of {cfg.CHUNK_FILE} are {source.chunk_height} blocks high "
+            f"instead of {cfg.CHUNK_HEIGHT}."
+        )
+    key = (cfg.CHUNK_FILE, cfg.BLOCK_WIDTH, cfg.BLOCK_HEIGHT)
+    library = _libraries.get(key)
+    if library is None:
+        library = _libraries[key] = ChunkLibrary(source, cfg.BLOCK_WIDTH, cfg.BLOCK_HEIGHT)
+        if cfg.CHUNK_FILE is None:
+            for name in chunks:
+                # compiles every chunk now, e.g. before worker processes are forked
+                library[name]
+    return library
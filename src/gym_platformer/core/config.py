@@ -1,6 +1,3 @@
-from pygame.locals import K_LEFT, K_RIGHT, K_d, K_q, K_z
-
-
 class Configuration:
     def __init__(self, proportion: float = 1.0, chunk_height: int = 16) -> None:
         """Configuration class object.
@@ -12,6 +9,9 @@ class Configuration:
         # folder for run's data files
         self.DATA_FOLDER: str = "data"
         self.DATA_FILE: str = "data"
+        # binary file the chunks and the default level are read from (see
+        # `gym_platformer.core.ChunkFile`), instead of `gym_platformer.core.chunks`
+        self.CHUNK_FILE: str | None = None
         # toggles random generation
         self.RANDOM_GEN = False
         # disables losing, for dev/testing purposes
@@ -33,6 +33,9 @@ class Configuration:
         self.SIZE_Y = (
             self.CHUNK_HEIGHT * self.BLOCK_HEIGHT * self.VISIBILITY_Y
         )  # height of the window in pixels.
+        # tile-grid observation: columns seen behind and ahead of the player
+        self.GRID_VIEW_BEHIND = 8
+        self.GRID_VIEW_AHEAD = 20
         # player size
         self.PLAYER_WIDTH = int(1 * self.BLOCK_WIDTH)
         self.PLAYER_HEIGHT = int(2 * self.BLOCK_HEIGHT)
@@ -57,11 +60,11 @@ class Configuration:
 
         # GAME CONTROLS
 
-        # Keys
-        self.KEY_RIGHT = K_d
-        self.KEY_LEFT = K_q
-        self.KEY_UP = K_z
+        # Keys, pygame key codes written out so that pygame is only imported to play
+        self.KEY_RIGHT = 100  # K_d
+        self.KEY_LEFT = 113  # K_q
+        self.KEY_UP = 122  # K_z
 
         # Camera keys
-        self.CAMERA_RIGHT = K_RIGHT
-        self.CAMERA_LEFT = K_LEFT
+        self.CAMERA_RIGHT = 1073741903  # K_RIGHT
+        self.CAMERA_LEFT = 1073741904  # K_LEFT
@@ -0,0 +1,238 @@
+import os
+from collections.abc import Container, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from .chunks import chunks
+
+# levels generated from each seed of a pack, whatever the number of processes
+LEVELS_PER_SEED = 4096
+
+
+def generate_levels(
+    rng: np.random.Generator,
+    n_levels: int,
+    n_chunks: int,
+    names: Sequence[str] | None = None,
+) -> np.ndarray:
+    """Generates levels made of chunks drawn at random.
+
+    Every level starts with the `"init"` chunk, followed by `n_chunks - 1`
+    chunks drawn uniformly from the other chunks.
+
+    Args:
+        rng (np.random.Generator): The random generator drawing the chunks.
+        n_levels (int): Number of levels.
+        n_chunks (int): Number of chunks of each level.
+        names (Sequence[str], optional): Names of the chunks to draw from,
+            e.g. `ChunkFile.names`. Defaults to the chunks of
+            `gym_platformer.core.chunks`.
+
+    Returns:
+        np.ndarray: Indexes in `names` of the chunks of each level (NxC).
+    """
+    names = list(chunks) if names is None else names
+    init = names.index("init")
+    levels = np.empty((n_levels, n_chunks), dtype=np.uint16 if len(names) <= 2**16 else np.uint32)
+    levels[:, 0] = init
+    drawn = rng.integers(len(names) - 1, size=(n_levels, n_chunks - 1))
+    # skips the init chunk
+    levels[:, 1:] = drawn + (drawn >= init)
+    return levels
+
+
+def generate_level(
+    rng: np.random.Generator, n_chunks: int, names: Sequence[str] | None = None
+) -> list[str]:
+    """Generates a level, see `generate_levels`.
+
+    Returns:
+        list[str]: The chunk names of the level.
+    """
+    names = list(chunks) if names is None else names
+    return [names[i] for i in generate_levels(rng, 1, n_chunks, names)[0]]
+
+
+def _generate_seeded(
+    seed: np.random.SeedSequence, n_levels: int, n_chunks: int, names: list[str]
+) -> np.ndarray:
+    return generate_levels(np.random.default_rng(seed), n_levels, n_chunks, names)
+
+
+def generate_level_pack(
+    path: str | os.PathLike,
+    n_levels: int,
+    n_chunks: int = 15,
+    seed: int | None = None,
+    num_workers: int = 1,
+    names: Sequence[str] | None = None,
+) -> Path:
+    """Generates levels ahead of time into a level pack file.
+
+    The levels are generated in blocks of `LEVELS_PER_SEED` levels, each from
+    its own seed derived from `seed`, so a pack only depends on its seed.
+
+    Args:
+        path (str | os.PathLike): The `.npz` file the pack is written to.
+        n_levels (int): Number of levels.
+        n_chunks (int): Number of chunks of each level. Defaults to 15.
+        seed (int, optional): Seed of the generation. Defaults to a random one.
+        num_workers (int): Number of processes generating the levels.
+            Defaults to 1.
+        names (Sequence[str], optional): Names of the chunks to draw from.
+            Defaults to the chunks of `gym_platformer.core.chunks`.
+
+    Returns:
+        Path: The path of the pack.
+    """
+    sizes = [LEVELS_PER_SEED] * (n_levels // LEVELS_PER_SEED)
+    if n_levels % LEVELS_PER_SEED:
+        sizes.append(n_levels % LEVELS_PER_SEED)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    names = list(chunks) if names is None else list(names)
+    args = ([n_chunks] * len(sizes), [names] * len(sizes))
+    if num_workers > 1:
+        with ProcessPoolExecutor(num_workers) as executor:
+            blocks = list(executor.map(_generate_seeded, seeds, sizes, *args))
+    else:
+        blocks = list(map(_generate_seeded, seeds, sizes, *args))
+    levels = np.concatenate(blocks) if blocks else np.zeros((0, n_chunks), dtype=np.uint16)
+    path = Path(path)
+    with path.open("wb") as file:
+        np.savez_compressed(file, names=np.array(names), levels=levels)
+    return path
+
+
+# level packs read by the process, by path
+_packs: dict[Path, "LevelPack"] = {}
+
+
+def _unpickle_pack(path: Path) -> "LevelPack":
+    """Gets a pickled level pack, read again unless the process already did."""
+    pack = _packs.get(path)
+    if pack is None:
+        # the chunks were checked when the pack was first read
+        pack = _packs[path] = LevelPack.__new__(LevelPack)
+        pack._read(path)
+    return pack
+
+
+class LevelPack:
+    def __init__(self, path: str | os.PathLike, chunk_names: Container[str] | None = None) -> None:
+        """Levels generated ahead of time, see `generate_level_pack`.
+
+        The pack is read once, then drawing a level costs the same whatever
+        the number of levels. It is pickled as its path, so that the levels
+        are not copied along with it.
+
+        Args:
+            path (str | os.PathLike): The `.npz` file of the pack.
+            chunk_names (Container[str], optional): Names of the chunks the
+                levels may use, e.g. a `ChunkFile`. Defaults to the chunks of
+                `gym_platformer.core.chunks`.
+        """
+        self._read(path)
+        chunk_names = chunks if chunk_names is None else chunk_names
+        unknown = [name for name in self.names if name not in chunk_names]
+        if unknown:
+            raise ValueError(f"level pack {path} uses unknown chunks {sorted(unknown)}.")
+        if len(self.levels) == 0:
+            raise ValueError(f"level pack {path} has no level.")
+        _packs[self.path] = self
+
+    def _read(self, path: str | os.PathLike) -> None:
+        self.path = Path(path).resolve()
+        with np.load(self.path) as data:
+            self.names: list[str] = data["names"].tolist()
+            self.levels: np.ndarray = data["levels"]
+
+    def __reduce__(self) -> tuple:
+        """Pickles the pack as its path."""
+        return _unpickle_pack, (self.path,)
+
+    def __len__(self) -> int:
+        """Gets the number of levels of the pack."""
+        return len(self.levels)
+
+    def level(self, index: int) -> list[str]:
+        """Gets the chunk names of a level of the pack."""
+        return [self.names[i] for i in self.levels[index]]
+
+    def sample(self, rng: np.random.Generator) -> list[str]:
+        """Draws a level of the pack.
+
+        Args:
+            rng (np.random.Generator): The random generator drawing the level.
+
+        Returns:
+            list[str]: The chunk names of the level.
+        """
+        return self.level(int(rng.integers(len(self.levels))))
+
+
+class EndlessLevel:
+    # chunks of each block when the chunks are drawn one by one
+    BLOCK_SIZE = 256
+
+    def __init__(self, seed: int, names: Sequence[str], levels: np.ndarray | None = None) -> None:
+        """Level without end, made of blocks of chunks drawn from a seed.
+
+        Block `i` only depends on the seed and `i`, so any chunk can be found
+        again while only the block of the last chunk asked for is kept. With
+        `levels`, a block is one of them drawn at random, without its first
+        chunk, otherwise it is `BLOCK_SIZE` chunks drawn like `generate_levels`.
+        The level is pickled as its arguments, see `from_pack` to chain the
+        levels of a pack without copying them.
+
+        Args:
+            seed (int): Seed of the level.
+            names (Sequence[str]): Names of the chunks.
+            levels (np.ndarray, optional): Indexes in `names` of the chunks of
+                the levels to chain (NxC). Defaults to chunks drawn one by one.
+        """
+        if levels is not None and levels.shape[1] < 2:
+            raise ValueError("levels to chain need at least two chunks.")
+        self.seed = seed
+        self.names = names
+        self.levels = levels
+        self.pack: LevelPack | None = None
+        self.block_size = self.BLOCK_SIZE if levels is None else levels.shape[1] - 1
+        self._block_idx = -1
+        self._block: np.ndarray
+
+    @classmethod
+    def from_pack(cls, seed: int, pack: LevelPack) -> "EndlessLevel":
+        """Chains the levels of a pack, the level being pickled with the pack path.
+
+        Args:
+            seed (int): Seed of the level.
+            pack (LevelPack): The levels to chain.
+
+        Returns:
+            EndlessLevel: The level.
+        """
+        level = cls(seed, pack.names, pack.levels)
+        level.pack = pack
+        return level
+
+    def __reduce__(self) -> tuple:
+        """Pickles the level as its arguments, without the block kept."""
+        if self.pack is not None:
+            return EndlessLevel.from_pack, (self.seed, self.pack)
+        return EndlessLevel, (self.seed, self.names, self.levels)
+
+    def __getitem__(self, index: int) -> str:
+        """Gets the name of the chunk at a position of the level, `"init"` first."""
+        if index == 0:
+            return "init"
+        block_idx, position = divmod(index - 1, self.block_size)
+        if block_idx != self._block_idx:
+            rng = np.random.default_rng([self.seed, block_idx])
+            if self.levels is None:
+                self._block = generate_levels(rng, 1, self.block_size + 1, self.names)[0, 1:]
+            else:
+                self._block = self.levels[rng.integers(len(self.levels)), 1:]
+            self._block_idx = block_idx
+        return self.names[self._block[position]]
@@ -1,14 +1,44 @@
+import bisect
+import math
 import random
+from collections import deque
+from collections.abc import Iterator
+from typing import NamedTuple
+
+import numpy as np
 
 from .block import Block
-from .chunks import chunks
+from .chunk_file import open_chunk_file
+from .chunk_library import CompiledChunk, chunk_library, compile_chunk
 from .config import Configuration
+from .level_pack import EndlessLevel
+from .rect import Rect, round_half_away
+
+
+class LiveChunk(NamedTuple):
+    """A chunk held in memory by the map."""
+
+    left: int
+    right: int
+    layout: CompiledChunk
+
+
+class MapState(NamedTuple):
+    """What changes in a map during an episode, the chunks being shared."""
+
+    live_chunks: tuple[LiveChunk, ...]
+    camera_x: int
+    level_idx: int
+    ends_dropped: int
+    end_cursor: int
+    level: tuple[str, ...] | EndlessLevel
+    rng_state: tuple | None
 
 
 class Map:
     def __init__(self, cfg: Configuration) -> None:
         self.cfg = cfg
-        self.level = [
+        self.level: list[str] | EndlessLevel = [
             "init",
             "chunk_1",
             "chunk_2",
@@ -25,13 +55,73 @@ class Map:
             "chunk_13",
             "chunk_14",
         ]
-        self.blocks: list[Block] = []
+        self.library = chunk_library(cfg)
+        # draws the chunks with `cfg.RANDOM_GEN`, seeded by the environment
+        self.rng = random.Random()  # noqa: S311
+        if cfg.CHUNK_FILE is not None:
+            # the first level of the file, if any
+            chunk_file = open_chunk_file(cfg.CHUNK_FILE)
+            self.level = chunk_file.level(0) if chunk_file.n_levels else ["init"]
+        # blocks are only built when asked for, see `blocks`
+        self._blocks: list[Block] | None = None
+        self.last_block_x: int | None = None
         self.level_idx: int = 1
-        self.NB_CHUNK = len(self.level)
+        self.NB_CHUNK: float = len(self.level)
+        # tile occupancy grid: one column per block column, one row per chunk row
+        self.grid_rect = Rect(
+            0,
+            (self.cfg.VISIBILITY_Y - 1) * self.cfg.CHUNK_HEIGHT * self.cfg.BLOCK_HEIGHT,
+            0,
+            self.cfg.CHUNK_HEIGHT * self.cfg.BLOCK_HEIGHT,
+        )
+        self._cells = np.zeros((0, self.cfg.CHUNK_HEIGHT), dtype=bool)
+        self._first_col = 0
+        # chunks in memory, in loading order
+        self.live_chunks: deque[LiveChunk] = deque()
+        # end blocks of the chunks dropped once behind the camera
+        self.ends_dropped = 0
+        # sorted x coordinates of the end blocks in memory and number of them passed
+        self.end_xs: list[int] = []
+        self.end_cursor = 0
+        # blocks keep their world coordinates, the camera is the visible part of the world
+        self.camera = Rect(0, 0, self.cfg.SIZE_X, self.cfg.SIZE_Y)
+
+    @property
+    def blocks(self) -> list[Block]:
+        """Blocks of the chunks in memory, column by column in loading order."""
+        if self._blocks is None:
+            self._blocks = [
+                Block(
+                    chunk.left + x,
+                    self.grid_rect.y + y,
+                    self.cfg,
+                    block_type="end" if end else "default",
+                )
+                for chunk in self.live_chunks
+                for x, y, end in zip(
+                    chunk.layout.block_x, chunk.layout.block_y, chunk.layout.block_end, strict=True
+                )
+            ]
+        return self._blocks
+
+    @property
+    def grid(self) -> np.ndarray:
+        """Occupancy of the tiles covered by `grid_rect`, indexed by `[column, row]`."""
+        n_cols = self.grid_rect.width // self.cfg.BLOCK_WIDTH
+        return self._cells[self._first_col : self._first_col + n_cols]
 
     def reset(self) -> None:
-        self.blocks = []
+        self._blocks = None
+        self.last_block_x = None
         self.level_idx = 1
+        self.grid_rect.x = 0
+        self.grid_rect.width = 0
+        self._first_col = 0
+        self.live_chunks.clear()
+        self.ends_dropped = 0
+        self.end_xs.clear()
+        self.end_cursor = 0
+        self.camera.x = 0
 
     def valid_chunk(self, chunk: list[str]) -> bool:
         if len(chunk) == self.cfg.CHUNK_HEIGHT:
@@ -42,50 +132,238 @@ class Map:
 
         if isinstance(identifier, str):
             # gets the chunk
-            chunk = chunks[identifier]
+            layout = self.library[identifier]
         elif isinstance(identifier, list):
             if self.valid_chunk(identifier):
-                chunk = identifier
+                layout = compile_chunk(identifier, self.cfg)
             else:
                 raise ValueError(
                     "given chunk is invalid."
                     f"The rules are: len(chunk)=={self.cfg.CHUNK_HEIGHT} "
                     f"and the items in the chunk must have th same lenght."
                 )
-        # sets the x coordinate for the generation.
-        x, y = (
-            x_start,
-            (self.cfg.VISIBILITY_Y - 1) * self.cfg.CHUNK_HEIGHT * self.cfg.BLOCK_HEIGHT,
+        self._load_layout(layout, x_start)
+
+    def _load_layout(self, layout: CompiledChunk, x_start: int) -> None:
+        first_col = self._grid_columns(x_start, len(layout.tiles))
+        self.grid[first_col : first_col + len(layout.tiles)] |= layout.tiles
+        for x in layout.end_x:
+            bisect.insort(self.end_xs, x_start + x)
+        if layout.block_x:
+            self.last_block_x = x_start + layout.block_x[-1]
+        self.live_chunks.append(LiveChunk(x_start, x_start + layout.width, layout))
+        self._blocks = None
+
+    def get_state(self) -> MapState:
+        """Gets the state of the map, see `set_state`."""
+        return MapState(
+            tuple(self.live_chunks),
+            self.camera.x,
+            self.level_idx,
+            self.ends_dropped,
+            self.end_cursor,
+            self.level if isinstance(self.level, EndlessLevel) else tuple(self.level),
+            # only copied when it is used
+            self.rng.getstate() if self.cfg.RANDOM_GEN else None,
         )
-        # generation
-        for column in range(len(chunk[0])):
-            for row in range(len(chunk)):
-                if chunk[row][column] == "W":
-                    self.blocks.append(Block(x, y, self.cfg))
-                elif chunk[row][column] == "E":
-                    self.blocks.append(Block(x, y, self.cfg, block_type="end"))
-
-                y += self.cfg.BLOCK_HEIGHT
-            x += self.cfg.BLOCK_WIDTH
-            y = (self.cfg.VISIBILITY_Y - 1) * self.cfg.CHUNK_HEIGHT * self.cfg.BLOCK_HEIGHT
+
+    def set_state(self, state: MapState) -> None:
+        """Puts the map back in a state given by `get_state`.
+
+        The chunks of the state are loaded again in place of the current ones,
+        reusing the memory of the grid.
+
+        Args:
+            state (MapState): The state of the map.
+        """
+        self.reset()
+        for chunk in state.live_chunks:
+            self._load_layout(chunk.layout, chunk.left)
+        self.camera.x = state.camera_x
+        self.level_idx = state.level_idx
+        self.ends_dropped = state.ends_dropped
+        self.end_cursor = state.end_cursor
+        self.set_level(state.level if isinstance(state.level, EndlessLevel) else list(state.level))
+        if state.rng_state is not None:
+            self.rng.setstate(state.rng_state)
+
+    def set_level(self, level: list[str] | EndlessLevel) -> None:
+        """Changes the chunks generated after the ones loaded.
+
+        Args:
+            level (list[str] | EndlessLevel): Names of the chunks of the level,
+                the first one being loaded by the environment on reset. An
+                endless level has an infinite `NB_CHUNK`.
+        """
+        self.level = level
+        self.NB_CHUNK = math.inf if isinstance(level, EndlessLevel) else len(level)
+
+    def _grid_columns(self, x_start: int, width: int) -> int:
+        """Makes room in the grid for `width` columns starting at `x_start`.
+
+        Returns:
+            int: Grid column of `x_start`.
+        """
+        block_width = self.cfg.BLOCK_WIDTH
+        if self.grid_rect.width == 0:
+            self.grid_rect.x = x_start
+        if (x_start - self.grid_rect.x) % block_width != 0:
+            raise ValueError(
+                f"chunk starting at x={x_start} is not aligned on the blocks grid "
+                f"(first column at x={self.grid_rect.x})."
+            )
+        first_col = (x_start - self.grid_rect.x) // block_width
+        old = self.grid
+        # new columns are added before and after the current ones
+        before = max(-first_col, 0)
+        n_cols = max(before + len(old), before + first_col + width)
+        if self._first_col < before or self._first_col - before + n_cols > len(self._cells):
+            if 2 * n_cols > len(self._cells):
+                # grows the buffer geometrically to load chunks in amortized constant time
+                cells = np.zeros((2 * n_cols, self.cfg.CHUNK_HEIGHT), dtype=bool)
+                cells[before : before + len(old)] = old
+                self._cells = cells
+            else:
+                # moves the columns back to the start of the buffer
+                self._cells[before : before + len(old)] = old
+            self._first_col = 0
+        else:
+            self._first_col -= before
+        self._cells[self._first_col : self._first_col + before] = False
+        self._cells[self._first_col + before + len(old) : self._first_col + n_cols] = False
+        self.grid_rect.x -= before * block_width
+        self.grid_rect.width = n_cols * block_width
+        return before + first_col
+
+    def drop_passed_chunks(self) -> int:
+        """Forgets the chunks that are entirely behind the camera.
+
+        The last loaded chunk is always kept, the next one is generated after it.
+
+        Returns:
+            int: Number of chunks dropped.
+        """
+        dropped = 0
+        while len(self.live_chunks) > 1 and self.live_chunks[0].right <= self.camera.left:
+            n_ends = len(self.live_chunks.popleft().layout.end_x)
+            # every end block behind the camera is passed, whichever chunk it belongs to
+            del self.end_xs[:n_ends]
+            self.end_cursor = max(self.end_cursor - n_ends, 0)
+            self.ends_dropped += n_ends
+            dropped += 1
+        if dropped:
+            self._blocks = None
+            # the grid now starts at the first column of the remaining chunks
+            x_start = min(chunk.left for chunk in self.live_chunks)
+            n_cols = max((x_start - self.grid_rect.x) // self.cfg.BLOCK_WIDTH, 0)
+            self._first_col += n_cols
+            self.grid_rect.x += n_cols * self.cfg.BLOCK_WIDTH
+            self.grid_rect.width -= n_cols * self.cfg.BLOCK_WIDTH
+        return dropped
+
+    def nearby_blocks(self, rect: Rect) -> Iterator[Rect]:
+        """Yields the blocks on the tiles overlapped by a rectangle.
+
+        Blocks come in the order of `blocks`, column by column. The rectangle
+        is read again after each block, so it may be moved while iterating.
+
+        Args:
+            rect (Rect): The rectangle to look around, in screen coordinates.
+
+        Yields:
+            Rect: The blocks, in screen coordinates.
+        """
+        block_width, block_height = self.cfg.BLOCK_WIDTH, self.cfg.BLOCK_HEIGHT
+        grid = self.grid
+        x_origin = self.grid_rect.x - self.camera.x
+        col = (rect.left - x_origin) // block_width
+        while col < len(grid) and x_origin + col * block_width < rect.right:
+            if col >= 0:
+                row = max((rect.top - self.grid_rect.y) // block_height, 0)
+                while row < len(grid[col]) and self.grid_rect.y + row * block_height < rect.bottom:
+                    if grid[col, row]:
+                        yield Rect(
+                            x_origin + col * block_width,
+                            self.grid_rect.y + row * block_height,
+                            block_width,
+                            block_height,
+                        )
+                    row += 1
+            col += 1
+
+    def local_grid(
+        self, x: int, behind: int, ahead: int, out: np.ndarray | None = None
+    ) -> np.ndarray:
+        """Gets the occupancy of the tiles around a world coordinate.
+
+        Args:
+            x (int): World coordinate on x axis.
+            behind (int): Number of columns on the left of the one of `x`.
+            ahead (int): Number of columns on the right of the one of `x`.
+            out (np.ndarray, optional): Array (HxW) the occupancy is written
+                into. Defaults to a new array.
+
+        Returns:
+            np.ndarray: The occupancy (HxW) of the `behind + 1 + ahead` columns,
+                `1` for a block and `0` for an empty or unloaded tile.
+        """
+        if out is None:
+            window = np.zeros((self.cfg.CHUNK_HEIGHT, behind + 1 + ahead), dtype=np.uint8)
+        else:
+            window = out
+            window.fill(0)
+        grid = self.grid
+        start = (x - self.grid_rect.x) // self.cfg.BLOCK_WIDTH - behind
+        first, last = max(start, 0), min(start + window.shape[1], len(grid))
+        if first < last:
+            window[:, first - start : last - start] = grid[first:last].T
+        return window
+
+    def scroll(self, x_speed: float) -> None:
+        """Moves the camera horizontally.
+
+        Args:
+            x_speed (float): Speed on x axis.
+        """
+        self.camera.x = round_half_away(self.camera.x + x_speed)
+
+    def chunks_passed(self, x: int) -> int:
+        """Counts the end blocks on the left of a world coordinate.
+
+        The count is kept between calls and only updated for the end blocks
+        crossed since the previous call.
+
+        Args:
+            x (int): World coordinate on x axis.
+
+        Returns:
+            int: Number of chunks passed.
+        """
+        while self.end_cursor < len(self.end_xs) and self.end_xs[self.end_cursor] < x:
+            self.end_cursor += 1
+        # the player may walk back over an end block that is still visible
+        while self.end_cursor > 0 and self.end_xs[self.end_cursor - 1] >= x:
+            self.end_cursor -= 1
+        return self.ends_dropped + self.end_cursor
 
     def end_of_chunk(self) -> bool:
-        return self.blocks[-1].rect.x < self.cfg.SIZE_X
+        return self.last_block_x < self.camera.right
 
     def level_generation(self) -> bool:
+        self.drop_passed_chunks()
 
         if self.end_of_chunk():
             # getting the x coordinate from where to start the generation
-            x_start = self.blocks[-1].rect.x + self.cfg.BLOCK_WIDTH
+            x_start = self.last_block_x + self.cfg.BLOCK_WIDTH
 
             # random generation
             if self.cfg.RANDOM_GEN:
                 # next chunk is chosen randomly
-                next_chunk_key = random.choice(list(chunks.keys()))  # noqa: S311
+                next_chunk_key = self.rng.choice(self.library.names)
                 self.load_chunk(next_chunk_key, x_start)
                 return True
             # sequential generation
-            if self.level_idx < len(self.level):
+            if self.level_idx < self.NB_CHUNK:
                 # selects the next chunk to be loaded in the chunk list
                 next_chunk_key = self.level[self.level_idx]
                 self.load_chunk(next_chunk_key, x_start)
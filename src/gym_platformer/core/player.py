@@ -1,7 +1,6 @@
-import pygame
-
-from .block import Block
 from .config import Configuration
+from .map import Map
+from .rect import Rect, round_half_away
 
 
 class Player:
@@ -14,7 +13,7 @@ class Player:
             cfg (Configuration): The configuration of the environment.
         """
         self.cfg = cfg
-        self.rect = pygame.Rect(
+        self.rect = Rect(
             self.cfg.START_X,
             self.cfg.START_Y,
             self.cfg.PLAYER_WIDTH,
@@ -32,48 +31,52 @@ class Player:
             # FIXME
             self.x_speed = float(int(self.x_speed * self.cfg.SLOWDOWN_X))
 
-    def collisions(self, x_speed: float, y_speed: float, blocks: list[Block]) -> None:
+    def collisions(self, x_speed: float, y_speed: float, map_obj: Map) -> None:
         """Handling of collisions when moving the player.
 
         Args:
             x_speed (float): Horizontal speed of the player.
             y_speed (float): Vertical speed of the player.
-            blocks (list[Block]): A list of blocks in the environment.
+            map_obj (Map): The map of the environment.
         """
-        for block in blocks:
-            if self.rect.colliderect(block.rect):
+        for block in map_obj.nearby_blocks(self.rect):
+            if self.rect.colliderect(block):
                 if x_speed > 0:
-                    self.rect.right = block.rect.left
+                    self.rect.right = block.left
                     self.slowdown()
                 elif x_speed < 0:
-                    self.rect.left = block.rect.right
+                    self.rect.left = block.right
                     self.slowdown()
 
                 if y_speed > 0:
-                    self.rect.bottom = block.rect.top
+                    self.rect.bottom = block.top
                     self.y_speed = 0.0
                 elif y_speed < 0:
-                    self.rect.top = block.rect.bottom
+                    self.rect.top = block.bottom
                     self.y_speed = 0.0
 
-    def ground(self, blocks: list[Block]) -> bool:
+    def ground(self, map_obj: Map) -> bool:
         """Checks whether the player is on the ground or not.
 
         Args:
-            blocks (list[Block]): A list of blocks in the environment.
+            map_obj (Map): The map of the environment.
         """
-        for block in blocks:
-            for pixel in range(-(self.cfg.BLOCK_WIDTH - 1), self.cfg.BLOCK_WIDTH):
-                if self.rect.bottom == block.rect.top and self.rect.left == block.rect.left + pixel:
-                    return True
+        # the blocks whose top touches the bottom of the player
+        feet = Rect(self.rect.left, self.rect.bottom, self.cfg.BLOCK_WIDTH, 1)
+        for block in map_obj.nearby_blocks(feet):
+            if (
+                self.rect.bottom == block.top
+                and abs(self.rect.left - block.left) < self.cfg.BLOCK_WIDTH
+            ):
+                return True
         return False
 
-    def update_speed(self, action: int, blocks: list[Block]) -> None:
+    def update_speed(self, action: int, map_obj: Map) -> None:
         """Updates player speed on horizontal and vertical axis.
 
         Args:
             action (int): A valid action index (see metadata for available indexes).
-            blocks (list[Block]): A list of blocks in the environment.
+            map_obj (Map): The map of the environment.
         """
         # HORIZONTAL MOVEMENTS
 
@@ -98,10 +101,11 @@ class Player:
         # VERTICAL MOVEMENTS
 
         # gravity
-        if not self.ground(blocks):
+        on_ground = self.ground(map_obj)
+        if not on_ground:
             self.y_speed += self.cfg.ACCELERATION_Y
 
-        if action in [2, 3, 4] and self.ground(blocks):
+        if action in [2, 3, 4] and on_ground:
             self.y_speed -= float(self.cfg.SPEED_Y)
 
         # x speed limit
@@ -110,39 +114,38 @@ class Player:
         elif self.x_speed > self.cfg.SPEED_X:
             self.x_speed = float(self.cfg.SPEED_X)
 
-    def update_coor(self, blocks: list[Block]) -> None:
+    def update_coor(self, map_obj: Map) -> None:
         """Moves the player.
 
         Args:
-            blocks (list[Block]): A list of blocks in the environment.
+            map_obj (Map): The map of the environment.
         """
-        self.rect.x += self.x_speed
+        self.rect.x = round_half_away(self.rect.x + self.x_speed)
 
         # correcting not to get past the middle of the screen
         if self.rect.x > self.cfg.SIZE_X / 2:
-            self.rect.x = self.cfg.SIZE_X / 2
+            self.rect.x = round_half_away(self.cfg.SIZE_X / 2)
 
         # correcting not to get past the left side of the screen
         if self.rect.x < 0:
             self.rect.x = 0
             self.x_speed = 0.0
 
-        # moves the map when the Player reaches the middle of the screen
+        # moves the camera when the Player reaches the middle of the screen
         if self.rect.x == self.cfg.SIZE_X / 2 and self.x_speed > 0:
-            for block in blocks:
-                block.move(-self.x_speed, 0)
+            map_obj.scroll(self.x_speed)
 
-        self.collisions(self.x_speed, 0, blocks)
+        self.collisions(self.x_speed, 0, map_obj)
 
-        self.rect.y += self.y_speed
-        self.collisions(0, self.y_speed, blocks)
+        self.rect.y = round_half_away(self.rect.y + self.y_speed)
+        self.collisions(0, self.y_speed, map_obj)
 
-    def step(self, action: int, blocks: list[Block]) -> None:
+    def step(self, action: int, map_obj: Map) -> None:
         """Updates player object state according to an action.
 
         Args:
             action (int): A valid action index (see metadata for available indexes).
-            blocks (list[Block]): A list of blocks in the environment.
+            map_obj (Map): The map of the environment.
         """
-        self.update_speed(action, blocks)
-        self.update_coor(blocks)
+        self.update_speed(action, map_obj)
+        self.update_coor(map_obj)
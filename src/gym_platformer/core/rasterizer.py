@@ -0,0 +1,156 @@
+import numpy as np
+
+from .chunk_library import ChunkCache
+from .config import Configuration
+from .map import Map
+from .player import Player
+from .rect import Rect
+
+
+class Rasterizer:
+    # pixels of the chunks drawn last, shared by every rasterizer
+    bitmaps: ChunkCache[tuple[np.ndarray, np.ndarray]] = ChunkCache()
+
+    def __init__(self, cfg: Configuration) -> None:
+        """Draws the environment into a preallocated NumPy frame.
+
+        Each chunk is turned into pixels once, kept among the chunks drawn last
+        (see `ChunkCache`), then frames are built by copying the visible slices
+        of the chunks. The frames are identical to the ones drawn with pygame.
+
+        Args:
+            cfg (Configuration): The configuration of the environment.
+        """
+        self.cfg = cfg
+        # full size buffers, only allocated once a full size frame is drawn
+        self._frame: np.ndarray | None = None
+        self._background: np.ndarray | None = None
+        # the part of the world seen by the camera, in screen coordinates
+        self.screen = Rect(0, 0, cfg.SIZE_X, cfg.SIZE_Y)
+        # colors of the palette indexes: background, block and player
+        self.palette = np.array([cfg.GREY, cfg.WHITE, cfg.ORANGE], dtype=np.uint8)
+        # luma of the palette colors (ITU-R BT.601)
+        self.gray_palette = np.rint(self.palette @ [0.299, 0.587, 0.114]).astype(np.uint8)
+        self._samples: dict[tuple[int, int], tuple[np.ndarray, np.ndarray]] = {}
+
+    @property
+    def frame(self) -> np.ndarray:
+        """Frame (HxWxC) drawn into when no array is given to `draw`."""
+        if self._frame is None:
+            self._frame = np.empty((self.cfg.SIZE_Y, self.cfg.SIZE_X, 3), dtype=np.uint8)
+        return self._frame
+
+    @property
+    def background(self) -> np.ndarray:
+        """Frame (HxWxC) of the background color, which every frame starts from."""
+        if self._background is None:
+            self._background = np.empty((self.cfg.SIZE_Y, self.cfg.SIZE_X, 3), dtype=np.uint8)
+            self._background[:] = self.cfg.GREY
+        return self._background
+
+    def chunk_bitmap(self, rows: tuple[str, ...]) -> tuple[np.ndarray, np.ndarray]:
+        """Gets the pixels of a chunk.
+
+        Args:
+            rows (tuple[str, ...]): The rows of the chunk.
+
+        Returns:
+            np.ndarray: The colors of the pixels (HxWxC).
+            np.ndarray: Whether each pixel belongs to a block (HxW).
+        """
+        key = (rows, self.cfg.BLOCK_WIDTH, self.cfg.BLOCK_HEIGHT, self.cfg.WHITE, self.cfg.GREY)
+        bitmap = self.bitmaps.get(key)
+        if bitmap is None:
+            tiles = np.array([[char in "WE" for char in row] for row in rows], dtype=bool)
+            mask = tiles.repeat(self.cfg.BLOCK_HEIGHT, axis=0).repeat(self.cfg.BLOCK_WIDTH, axis=1)
+            colors = np.where(mask[..., None], self.cfg.WHITE, self.cfg.GREY).astype(np.uint8)
+            colors.flags.writeable = False
+            mask.flags.writeable = False
+            bitmap = self.bitmaps.put(key, (colors, mask))
+        return bitmap
+
+    def draw(self, map_obj: Map, player: Player, out: np.ndarray | None = None) -> np.ndarray:
+        """Draws the part of the map seen by the camera and the player.
+
+        Args:
+            map_obj (Map): The map of the environment.
+            player (Player): The player of the environment.
+            out (np.ndarray, optional): Array (HxWxC) the frame is drawn into.
+                Defaults to `frame`.
+
+        Returns:
+            np.ndarray: The frame (HxWxC), `out` if given. Otherwise it is
+                overwritten by the next call.
+        """
+        frame = self.frame if out is None else out
+        np.copyto(frame, self.background)
+        camera = map_obj.camera
+        top, bottom = map_obj.grid_rect.top, map_obj.grid_rect.bottom
+        drawn_left, drawn_right = camera.right, camera.left
+        for chunk in map_obj.live_chunks:
+            left, right = max(chunk.left, camera.left), min(chunk.right, camera.right)
+            if left >= right:
+                continue
+            colors, mask = self.chunk_bitmap(chunk.layout.rows)
+            source = slice(left - chunk.left, right - chunk.left)
+            target = frame[top:bottom, left - camera.left : right - camera.left]
+            if right <= drawn_left or left >= drawn_right:
+                target[...] = colors[:, source]
+            else:
+                # chunks loaded on top of each other only add their blocks
+                np.copyto(target, colors[:, source], where=mask[:, source, None])
+            drawn_left, drawn_right = min(drawn_left, left), max(drawn_right, right)
+        # draws the player
+        rect = player.rect.clip(self.screen)
+        frame[rect.top : rect.bottom, rect.left : rect.right] = self.cfg.ORANGE
+        return frame
+
+    def draw_indexes(
+        self,
+        map_obj: Map,
+        player: Player,
+        size: tuple[int, int],
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Draws a frame of another size, as palette indexes.
+
+        Each pixel takes the value of the pixel of the full size frame at its
+        center (nearest neighbor), read from the tiles of the map instead of
+        drawing the full size frame.
+
+        Args:
+            map_obj (Map): The map of the environment.
+            player (Player): The player of the environment.
+            size (tuple[int, int]): Height and width of the frame.
+            out (np.ndarray, optional): Array (HxW) the frame is drawn into.
+                Defaults to a new array.
+
+        Returns:
+            np.ndarray: The frame (HxW) of indexes in `palette`.
+        """
+        if size not in self._samples:
+            height, width = size
+            self._samples[size] = (
+                (2 * np.arange(height) + 1) * self.cfg.SIZE_Y // (2 * height),
+                (2 * np.arange(width) + 1) * self.cfg.SIZE_X // (2 * width),
+            )
+        ys, xs = self._samples[size]
+        if out is None:
+            frame = np.zeros(size, dtype=np.uint8)
+        else:
+            frame = out
+            frame.fill(0)
+
+        grid = map_obj.grid
+        rows = (ys - map_obj.grid_rect.top) // self.cfg.BLOCK_HEIGHT
+        cols = (xs + map_obj.camera.left - map_obj.grid_rect.left) // self.cfg.BLOCK_WIDTH
+        in_rows = (rows >= 0) & (rows < self.cfg.CHUNK_HEIGHT)
+        in_cols = (cols >= 0) & (cols < len(grid))
+        if in_rows.any() and in_cols.any():
+            tiles = grid[np.ix_(cols[in_cols], rows[in_rows])].T
+            frame[np.ix_(in_rows, in_cols)] = tiles
+        # draws the player
+        on_rows = (ys >= player.rect.top) & (ys < player.rect.bottom)
+        on_cols = (xs >= player.rect.left) & (xs < player.rect.right)
+        frame[np.ix_(on_rows, on_cols)] = 2
+        return frame
@@ -0,0 +1,141 @@
+import math
+from collections.abc import Iterator
+
+
+def round_half_away(value: float) -> int:
+    """Rounds a coordinate half away from zero.
+
+    It is what `pygame.Rect` 2.x does with floats, but older versions truncate
+    them, so coordinates are rounded explicitly to move the same way whatever
+    the pygame version (see `gym_platformer.core.batch_player.round_coor`).
+
+    Args:
+        value (float): Float coordinate.
+
+    Returns:
+        int: The rounded coordinate.
+    """
+    rounded = math.floor(abs(value) + 0.5)
+    return rounded if value >= 0 else -rounded
+
+
+class Rect:
+    __slots__ = ("height", "width", "x", "y")
+
+    def __init__(self, x: int, y: int, width: int, height: int) -> None:
+        """Rectangle of integer coordinates, the part of `pygame.Rect` the game uses.
+
+        The physics only needs these few attributes, so pygame is not imported
+        unless something is drawn with it. Coordinates are integers, floats
+        being rounded by the callers with `round_half_away` like pygame does.
+        A `Rect` is a sequence of its 4 values, which pygame functions take.
+
+        Args:
+            x (int): Coordinate of the left side.
+            y (int): Coordinate of the top side.
+            width (int): Width.
+            height (int): Height.
+        """
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    @property
+    def left(self) -> int:
+        """Coordinate of the left side, `x`."""
+        return self.x
+
+    @left.setter
+    def left(self, value: int) -> None:
+        self.x = value
+
+    @property
+    def right(self) -> int:
+        """Coordinate of the right side, excluded."""
+        return self.x + self.width
+
+    @right.setter
+    def right(self, value: int) -> None:
+        self.x = value - self.width
+
+    @property
+    def top(self) -> int:
+        """Coordinate of the top side, `y`."""
+        return self.y
+
+    @top.setter
+    def top(self, value: int) -> None:
+        self.y = value
+
+    @property
+    def bottom(self) -> int:
+        """Coordinate of the bottom side, excluded."""
+        return self.y + self.height
+
+    @bottom.setter
+    def bottom(self, value: int) -> None:
+        self.y = value - self.height
+
+    @property
+    def topleft(self) -> tuple[int, int]:
+        """Coordinates of the top left corner."""
+        return self.x, self.y
+
+    @topleft.setter
+    def topleft(self, value: tuple[int, int]) -> None:
+        self.x, self.y = value
+
+    def colliderect(self, other: "Rect") -> bool:
+        """Tells whether two rectangles overlap, empty ones overlapping nothing."""
+        return (
+            self.width > 0
+            and self.height > 0
+            and other.width > 0
+            and other.height > 0
+            and self.x < other.x + other.width
+            and other.x < self.x + self.width
+            and self.y < other.y + other.height
+            and other.y < self.y + self.height
+        )
+
+    def clip(self, other: "Rect") -> "Rect":
+        """Gets the part of the rectangle inside another one.
+
+        Returns:
+            Rect: The intersection, empty at the corner of the rectangle if
+                they do not overlap.
+        """
+        left, right = max(self.x, other.x), min(self.right, other.right)
+        top, bottom = max(self.y, other.y), min(self.bottom, other.bottom)
+        if left >= right or top >= bottom:
+            return Rect(self.x, self.y, 0, 0)
+        return Rect(left, top, right - left, bottom - top)
+
+    def move(self, x: int, y: int) -> "Rect":
+        """Gets the rectangle moved by an offset."""
+        return Rect(self.x + x, self.y + y, self.width, self.height)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterates over `x`, `y`, `width` and `height`."""
+        return iter((self.x, self.y, self.width, self.height))
+
+    def __len__(self) -> int:
+        """Gets the number of values, 4."""
+        return 4
+
+    def __getitem__(self, index: int) -> int:
+        """Gets `x`, `y`, `width` or `height` by position."""
+        return (self.x, self.y, self.width, self.height)[index]
+
+    def __eq__(self, other: object) -> bool:
+        """Tells whether another rectangle or a sequence has the same values."""
+        if not isinstance(other, Rect | tuple | list):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Gets the constructor call of the rectangle."""
+        return f"Rect({self.x}, {self.y}, {self.width}, {self.height})"
@@ -1,2 +1,4 @@
 # flake8: noqa
-from gym_platformer.envs.platformer_env import PlatformerEnv
+from gym_platformer.envs.platformer_env import EpisodeLog, PlatformerEnv, PlatformerState
+from gym_platformer.envs.platformer_vector_env import PlatformerVectorEnv
+from gym_platformer.envs.platformer_async_vector_env import PlatformerAsyncVectorEnv
@@ -0,0 +1,243 @@
+import contextlib
+import itertools
+import multiprocessing
+import os
+import traceback
+from multiprocessing.connection import Connection
+from typing import Any
+
+import numpy as np
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+
+from gym_platformer.core.chunk_library import chunk_library
+from gym_platformer.envs.platformer_env import PlatformerEnv
+
+
+def _worker(
+    pipe: Connection,
+    parent_pipe: Connection,
+    env_kwargs: dict[str, Any],
+    shared: dict[str, tuple[Any, np.dtype, tuple[int, ...]]],
+    start: int,
+    stop: int,
+) -> None:
+    """Plays the episodes `start` to `stop` of a `PlatformerAsyncVectorEnv`."""
+    parent_pipe.close()
+    observations = {
+        key: np.frombuffer(raw, dtype=dtype).reshape(shape)
+        for key, (raw, dtype, shape) in shared.items()
+    }
+    envs = []
+    for i in range(start, stop):
+        env = PlatformerEnv(copy_obs=False, **env_kwargs)
+        # the environment draws its observations straight into the shared memory
+        env.set_obs_buffers({key: value[i] for key, value in observations.items()})
+        envs.append(env)
+    autoreset = np.zeros(len(envs), dtype=bool)
+    rewards = np.zeros(len(envs), dtype=np.float64)
+    terminations = np.zeros(len(envs), dtype=bool)
+    infos: dict[str, list] = {"time": [], "completion": [], "score": []}
+
+    while True:
+        command, data = pipe.recv()
+        if command == "close":
+            break
+        for value in infos.values():
+            value.clear()
+        try:
+            if command == "reset":
+                for i, env in enumerate(envs):
+                    _, info = env.reset(seed=None if data is None else data + i)
+                    for key, value in info.items():
+                        infos[key].append(value)
+                autoreset[:] = False
+                pipe.send((True, infos))
+            elif command == "step":
+                for i, (env, action) in enumerate(zip(envs, data, strict=True)):
+                    if autoreset[i]:
+                        # episodes that ended on the previous step start over
+                        _, info = env.reset()
+                        rewards[i], terminations[i] = 0.0, False
+                    else:
+                        _, rewards[i], terminations[i], _, info = env.step(int(action))
+                    for key, value in info.items():
+                        infos[key].append(value)
+                autoreset[:] = terminations
+                pipe.send((True, (rewards, terminations, infos)))
+            else:
+                pipe.send((False, f"unknown command '{command}'"))
+        except Exception:  # noqa: BLE001
+            # the error is raised in the main process
+            pipe.send((False, traceback.format_exc()))
+    for env in envs:
+        env.close()
+    pipe.close()
+
+
+class PlatformerAsyncVectorEnv(VectorEnv):
+    """PlatformerEnv episodes played in parallel by worker processes.
+
+    Args:
+        num_envs (int): Number of episodes played in parallel. Defaults to 1.
+        num_workers (int, optional): Number of worker processes, each playing a
+            contiguous share of the episodes. Defaults to the number of CPUs,
+            at most `num_envs`.
+        copy (bool): Whether observations are copies or the shared arrays
+            the workers write into, which are overwritten by the next call to
+            `step` or `reset`. Default to True.
+        context (str, optional): Start method of the worker processes, see
+            `multiprocessing.get_context`. Defaults to the platform default.
+        **env_kwargs: Arguments of every `PlatformerEnv`, except `render_mode`
+            and `copy_obs`, which `copy` replaces.
+
+    Description:
+        Every `PlatformerEnv` writes its observations straight into arrays in
+        shared memory, so only actions, rewards, terminations and information
+        go through the pipes to the workers. The chunks are compiled before the
+        workers start, so forked workers share them with the main process.
+        Finished episodes are reset on the next call to `step` (next-step
+        autoreset).
+
+    Observation:
+        The observation of `PlatformerEnv`, each entry batched over the episodes.
+
+    Information:
+        The information of `PlatformerEnv`, each entry batched over the episodes.
+
+    Actions:
+        Type: MultiDiscrete([6] * num_envs)
+        One `PlatformerEnv` action per episode.
+    """
+
+    metadata = {"autoreset_mode": AutoresetMode.NEXT_STEP}
+
+    def __init__(
+        self,
+        num_envs: int = 1,
+        num_workers: int | None = None,
+        copy: bool = True,
+        context: str | None = None,
+        **env_kwargs: Any,
+    ) -> None:
+        if "copy_obs" in env_kwargs:
+            # the workers write into the shared arrays
+            raise ValueError("copy_obs cannot be set, use the copy argument instead.")
+        self.num_envs = num_envs
+        self.copy = copy
+        env = PlatformerEnv(**env_kwargs)
+        # compiles the chunks once for every worker
+        chunk_library(env.cfg)
+        self.single_observation_space = env.observation_space
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.single_action_space = env.action_space
+        self.action_space = batch_space(self.single_action_space, num_envs)
+        env.close()
+
+        ctx = multiprocessing.get_context(context)
+        shared = {}
+        self.observations = {}
+        for key, space in self.observation_space.items():
+            raw = ctx.RawArray("B", int(np.prod(space.shape)) * space.dtype.itemsize)
+            shared[key] = (raw, space.dtype, space.shape)
+            self.observations[key] = np.frombuffer(raw, dtype=space.dtype).reshape(space.shape)
+
+        num_workers = min(num_workers or os.cpu_count() or 1, num_envs)
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int).tolist()
+        self.slices = [slice(start, stop) for start, stop in itertools.pairwise(bounds)]
+        self.pipes: list[Connection] = []
+        self.processes = []
+        for worker_slice in self.slices:
+            parent_pipe, child_pipe = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                args=(
+                    child_pipe,
+                    parent_pipe,
+                    env_kwargs,
+                    shared,
+                    worker_slice.start,
+                    worker_slice.stop,
+                ),
+                daemon=True,
+            )
+            process.start()
+            child_pipe.close()
+            self.pipes.append(parent_pipe)
+            self.processes.append(process)
+
+    def _receive(self) -> list[Any]:
+        results = []
+        errors = []
+        for pipe in self.pipes:
+            success, result = pipe.recv()
+            if success:
+                results.append(result)
+            else:
+                errors.append(result)
+        if errors:
+            raise RuntimeError("a worker failed:\n" + "\n".join(errors))
+        return results
+
+    def _get_obs(self) -> dict[str, np.ndarray]:
+        if self.copy:
+            return {key: value.copy() for key, value in self.observations.items()}
+        return dict(self.observations)
+
+    @staticmethod
+    def _batch_infos(infos: list[dict[str, list]]) -> dict[str, np.ndarray]:
+        return {key: np.concatenate([np.asarray(info[key]) for info in infos]) for key in infos[0]}
+
+    def reset(
+        self, *, seed: int | None = None, options: dict[str, Any] | None = None
+    ) -> tuple[dict[str, np.ndarray], dict[str, Any]]:
+        """Resets the state of every episode.
+
+        Args:
+            seed (int, optional): Seed of the first episode, the next ones get
+                the following integers.
+            options (dict[str, Any], optional): Unused.
+        """
+        for pipe, worker_slice in zip(self.pipes, self.slices, strict=True):
+            pipe.send(("reset", None if seed is None else seed + worker_slice.start))
+        infos = self._receive()
+        return self._get_obs(), self._batch_infos(infos)
+
+    def step(
+        self, actions: np.ndarray
+    ) -> tuple[dict[str, np.ndarray], np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]:
+        """Updates every episode according to the actions of the agents.
+
+        Args:
+            actions (np.ndarray): One valid action index per episode.
+
+        Returns:
+            dict[str, np.ndarray]: Observations of the episodes.
+            np.ndarray: Rewards for making the actions.
+            np.ndarray: Indicates episodes completion.
+            np.ndarray: Indicates episodes truncation.
+            dict[str, Any]: Additional information about the episodes.
+        """
+        actions = np.asarray(actions)
+        if not self.action_space.contains(actions):
+            raise ValueError(f"{actions} ({type(actions)}) invalid.")
+        for pipe, worker_slice in zip(self.pipes, self.slices, strict=True):
+            pipe.send(("step", actions[worker_slice]))
+        rewards, terminations, infos = zip(*self._receive(), strict=True)
+        return (
+            self._get_obs(),
+            np.concatenate(rewards),
+            np.concatenate(terminations),
+            np.zeros(self.num_envs, dtype=bool),
+            self._batch_infos(list(infos)),
+        )
+
+    def close_extras(self, **kwargs: Any) -> None:
+        """Stops the worker processes."""
+        for pipe in self.pipes:
+            # the worker may already be gone, e.g. when the interpreter exits
+            with contextlib.suppress(OSError):
+                pipe.send(("close", None))
+            pipe.close()
+        for process in self.processes:
+            process.join()
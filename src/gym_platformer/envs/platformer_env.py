@@ -1,13 +1,53 @@
+import math
+import os
 import warnings
-from collections.abc import Callable
-from typing import Any, Literal
+from array import array
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Any, Literal, NamedTuple
 
 import numpy as np
-import pygame
 from gymnasium import Env, spaces
 
-from gym_platformer.core import Configuration, Map, Player
-from gym_platformer.utils import custom_score
+from gym_platformer.core import (
+    BatchPlayer,
+    Configuration,
+    LevelPack,
+    Map,
+    MapState,
+    Player,
+    Rasterizer,
+)
+from gym_platformer.core.level_pack import EndlessLevel, generate_level
+from gym_platformer.utils import PhaseProfiler, custom_score
+
+if TYPE_CHECKING:
+    import pygame
+
+
+class PlatformerState(NamedTuple):
+    """State of a `PlatformerEnv` episode, see `PlatformerEnv.clone_state`."""
+
+    map_state: MapState
+    player_pos: tuple[int, int]
+    player_vel: tuple[float, float]
+    time_val: int
+    score_val: float
+    completion: float
+    last_chunk_time: int
+    steps_beyond_done: int | None
+    # last action played in the log of the environment, see `episode_log`
+    log_node: int
+    # last `frame_stack` frames, oldest first, None without stacking
+    frames: bytes | None
+
+
+class EpisodeLog(NamedTuple):
+    """What an episode is played again from, see `PlatformerEnv.replay`."""
+
+    seed: int
+    # chunk names of the level, None for an endless level which the seed gives
+    level: tuple[str, ...] | None
+    actions: bytes
 
 
 class PlatformerEnv(Env):
@@ -16,9 +56,68 @@ class PlatformerEnv(Env):
     Args:
         score_fct (Callable[..., float]), default=`gym_platformer.utils.custom_score`
             The score function that will be use to compute the overall
-            score of the agent.
+            score of the agent. `simulate` calls it with NumPy arrays of the
+            rollouts, and calls it rollout by rollout unless it returns an
+            array of their shape.
         ep_duration (float): The duration of the episode in number of environment updates.
             Default to 50.
+        render_backend (str): How frames are drawn. `"numpy"` copies pre-drawn
+            chunks into an array, `"pygame"` draws every block on a pygame
+            surface. Both give the same frames. Default to `"numpy"`.
+        obs_mode (str): What the observation holds besides the player state.
+            `"image"` adds the game window image, `"grid"` adds the occupancy
+            of the tiles around the player and `"state"` adds nothing, so no
+            frame is drawn. Default to `"image"`.
+        image_size (tuple[int, int], optional): Height and width of the image
+            observation. Smaller images are drawn directly at that size, each
+            pixel taking the color at its center in the game window. Default to
+            the size of the game window.
+        image_color (str): Pixels of the image observation. `"rgb"` gives
+            colors (HxWxC), `"grayscale"` their luma (HxW) and `"palette"` the
+            index (HxW) of what is drawn: 0 for the background, 1 for a block
+            and 2 for the player. Default to `"rgb"`.
+        copy_obs (bool): Whether observations are copies or the arrays the
+            environment writes every observation into (see `obs_buffers`),
+            which are overwritten by the next call to `step` or `reset`. The
+            stacked entry is then a view of the ring buffer of `frame_stack`.
+            Default to True.
+        check_obs (bool): Whether the episode also ends on any observation out
+            of the observation space, which checks every entry, image
+            included. It is a debugging aid, the player leaving the window is
+            enough to end the episode otherwise. Default to False.
+        profile (bool): Whether the phases of `step` are timed, see `stats`.
+            Default to False.
+        levels (str | os.PathLike | LevelPack): The level of each episode.
+            `"fixed"` plays the same level every time, `"random"` generates
+            a new one from `np_random` on each reset and a level pack (see
+            `gym_platformer.core.generate_level_pack`), or its path, gives
+            levels drawn from the pack with `np_random`. Default to `"fixed"`.
+        chunk_file (str | os.PathLike, optional): File of the chunks and of
+            the fixed level (its first one), see
+            `gym_platformer.core.write_chunk_file`. The file is memory-mapped
+            and chunks are only read when loaded. It needs an `"init"` chunk,
+            which starts every episode. Default to the chunks of
+            `gym_platformer.core.chunks`.
+        frame_skip (int): Number of frames each action is played for, the
+            physics being updated every frame and the observation only drawn
+            after the last one. The reward is the sum of the rewards of the
+            frames, which stop at the end of the episode. `ep_duration` counts
+            frames. Default to 1.
+        frame_stack (int): Number of last frames of the `"image"` or `"grid"`
+            entry stacked in the observation (KxHxW[xC]), oldest first. The
+            frames are kept in a ring buffer, in which each one is drawn once,
+            and the stack is a view of it, see `copy_obs`. The first frame of
+            an episode fills the stack. Default to 1, no stacking.
+        endless (bool): Whether levels never end (see
+            `gym_platformer.core.EndlessLevel`). Chunks are streamed as the
+            camera moves forward and dropped once behind it: the fixed level
+            is repeated, random chunks are drawn from `np_random` or levels of
+            the pack are chained, depending on `levels`. The completion is
+            then the number of chunks passed. Default to False.
+        record_actions (bool): Whether the actions played are logged, one byte
+            each, to get the log of the episode with `episode_log`. The log
+            grows with the episode, which never ends with an infinite
+            `ep_duration` or an endless level. Default to False.
 
     Description:
         Continuous platformer environment for reinforcement learning with gym
@@ -30,9 +129,10 @@ class PlatformerEnv(Env):
         See https://github.com/maxenceblanc/simple-platformer for more details.
 
     Observation:
-        Type: Box(5)
+        Type: Dict
         Num     Observation                     Min         Max
-        0       Game window image (HxWxC)         0         255
+        0       Game window image (HxW[xC])       0         255     (obs_mode="image")
+        0       Tiles around the player (HxW)     0         1       (obs_mode="grid")
         1       Player Horizontal Position        0         Inf
         2       Player Vertical Position          0         Height of the window - Player height
         3       Player Horizontal Velocity     -Inf         Inf
@@ -63,9 +163,52 @@ class PlatformerEnv(Env):
         render_mode: Literal["human", "rgb_array"] | None = None,
         score_fct: Callable[..., float] = custom_score,
         ep_duration: float = 50,
+        render_backend: Literal["numpy", "pygame"] = "numpy",
+        obs_mode: Literal["image", "grid", "state"] = "image",
+        image_size: tuple[int, int] | None = None,
+        image_color: Literal["rgb", "grayscale", "palette"] = "rgb",
+        copy_obs: bool = True,
+        check_obs: bool = False,
+        profile: bool = False,
+        levels: str | os.PathLike | LevelPack = "fixed",
+        chunk_file: str | os.PathLike | None = None,
+        endless: bool = False,
+        frame_skip: int = 1,
+        frame_stack: int = 1,
+        record_actions: bool = False,
     ) -> None:
+        if render_backend not in ("numpy", "pygame"):
+            raise ValueError(
+                f"expected 'numpy' or 'pygame' as value for render_backend argument "
+                f"instead of '{render_backend}'"
+            )
+        if obs_mode not in ("image", "grid", "state"):
+            raise ValueError(
+                f"expected 'image', 'grid' or 'state' as value for obs_mode argument "
+                f"instead of '{obs_mode}'"
+            )
+        if image_color not in ("rgb", "grayscale", "palette"):
+            raise ValueError(
+                f"expected 'rgb', 'grayscale' or 'palette' as value for image_color argument "
+                f"instead of '{image_color}'"
+            )
+        if frame_skip < 1:
+            raise ValueError(f"expected a positive frame_skip instead of {frame_skip}")
+        if frame_stack < 1:
+            raise ValueError(f"expected a positive frame_stack instead of {frame_stack}")
+        if frame_stack > 1 and obs_mode == "state":
+            raise ValueError("frame_stack needs the 'image' or 'grid' obs_mode")
         self.cfg = Configuration()
+        if chunk_file is not None:
+            self.cfg.CHUNK_FILE = os.fspath(chunk_file)
         self.map = Map(self.cfg)
+        if isinstance(levels, LevelPack) or levels in ("fixed", "random"):
+            self.levels = levels
+        else:
+            self.levels = LevelPack(levels, self.map.library)
+        self.level_length = len(self.map.level)
+        self.endless = endless
+        self.frame_skip = frame_skip
         self.score_fct = score_fct
         self.score_val: float
         self.player: Player
@@ -74,11 +217,45 @@ class PlatformerEnv(Env):
         self.completion: float
         self.last_chunk_time: int
         self.viewer: pygame.Surface
-
-        image_shape = (self.cfg.SIZE_Y, self.cfg.SIZE_X, 3)
+        self.render_backend = render_backend
+        self.rasterizer = Rasterizer(self.cfg)
+
+        self.obs_mode = obs_mode
+        self.image_size = tuple(image_size or (self.cfg.SIZE_Y, self.cfg.SIZE_X))
+        self.image_color = image_color
+        # indexes of the palette of downsized images, see `_draw_image`
+        self._image_indexes: np.ndarray | None = None
+        observation_spaces = {}
+        if obs_mode == "image":
+            if image_color == "rgb":
+                image_space = spaces.Box(0, 255, shape=(*self.image_size, 3), dtype=np.uint8)
+            elif image_color == "grayscale":
+                image_space = spaces.Box(0, 255, shape=self.image_size, dtype=np.uint8)
+            else:
+                image_space = spaces.Box(0, 2, shape=self.image_size, dtype=np.uint8)
+            observation_spaces["image"] = image_space
+        elif obs_mode == "grid":
+            grid_shape = (
+                self.cfg.CHUNK_HEIGHT,
+                self.cfg.GRID_VIEW_BEHIND + 1 + self.cfg.GRID_VIEW_AHEAD,
+            )
+            observation_spaces["grid"] = spaces.Box(0, 1, shape=grid_shape, dtype=np.uint8)
+        self.frame_stack = frame_stack
+        # ring buffer of the last frames, see `_push_frame`
+        self._frames: np.ndarray | None = None
+        self._frame_pos = 0
+        if frame_stack > 1:
+            frame_space = observation_spaces[obs_mode]
+            self._frames = np.zeros((2 * frame_stack - 1, *frame_space.shape), dtype=np.uint8)
+            observation_spaces[obs_mode] = spaces.Box(
+                0,
+                int(frame_space.high.max()),
+                shape=(frame_stack, *frame_space.shape),
+                dtype=np.uint8,
+            )
         self.observation_space = spaces.Dict(
             {
-                "image": spaces.Box(0, 255, shape=image_shape, dtype=np.uint8),
+                **observation_spaces,
                 "player_pos_x": spaces.Box(low=0, high=float("inf"), shape=(1,), dtype=np.float32),
                 "player_pos_y": spaces.Box(
                     low=0,
@@ -92,21 +269,152 @@ class PlatformerEnv(Env):
             }
         )
 
+        self.copy_obs = copy_obs
+        self.check_obs = check_obs
+        self.obs_buffers = {
+            key: np.zeros(space.shape, dtype=space.dtype)
+            for key, space in self.observation_space.items()
+        }
+        # array of the caller the stack is copied into, see `set_obs_buffers`
+        self._stack_out: np.ndarray | None = None
+        if self._frames is not None:
+            self.obs_buffers[obs_mode] = self._frames[:frame_stack]
+
         self.action_space = spaces.Discrete(6)
 
         self.steps_beyond_done: int | None
+        self.record_actions = record_actions
+        # actions played, each one linked to the one played before it, so that
+        # a state only keeps its place in the log (see `_log_action`)
+        self._log_base = 0
+        self._log_actions = bytearray()
+        self._log_parents = array("q")
+        # last action played, None once the log is lost
+        self._log_node: int | None = -1
+        self._reset_snapshot: tuple[MapState, dict[str, np.ndarray]] | None = None
+        # map holding the level ahead of the episode for `simulate`
+        self._lookahead_map: Map | None = None
+        self.profiler: PhaseProfiler | None = None
+        self._profiling = False
+        self.set_profiling(profile)
 
         self.render_mode = render_mode
         self.window = None
         self.clock = None
 
+    def set_obs_buffers(self, buffers: dict[str, np.ndarray]) -> None:
+        """Sets the arrays observations are written into.
+
+        Lets the caller gather the observations of many environments in its own
+        arrays, e.g. one row of a batch per environment, with `copy_obs=False`.
+
+        Args:
+            buffers (dict[str, np.ndarray]): One array per observation entry,
+                with the shape and dtype of its space.
+        """
+        if set(buffers) != set(self.observation_space.spaces):
+            raise ValueError(
+                f"expected buffers for {sorted(self.observation_space.spaces)} "
+                f"instead of {sorted(buffers)}"
+            )
+        for key, buffer in buffers.items():
+            space = self.observation_space[key]
+            if buffer.shape != space.shape or buffer.dtype != space.dtype:
+                raise ValueError(
+                    f"expected a {space.dtype} array of shape {space.shape} for '{key}' "
+                    f"instead of a {buffer.dtype} array of shape {buffer.shape}"
+                )
+        self.obs_buffers = dict(buffers)
+        if self._frames is not None:
+            self._stack_out = self.obs_buffers[self.obs_mode]
+
     def _get_obs(self) -> dict[str, Any]:
-        return {
-            "image": self.render(mode="rgb_array"),
-            "player_pos_x": np.array([self.player.rect.x], dtype=np.float32),
-            "player_pos_y": np.array([self.player.rect.y], dtype=np.float32),
-            "player_vel": np.array([self.player.x_speed, self.player.y_speed], dtype=np.float32),
-        }
+        observation = self.obs_buffers
+        # stacked frames are drawn into the ring buffer
+        frame = (
+            observation.get(self.obs_mode)
+            if self._frames is None
+            else self._frames[self._frame_pos]
+        )
+        if self.obs_mode == "image":
+            self._draw_image(frame)
+        elif self.obs_mode == "grid":
+            self.map.local_grid(
+                self.player.rect.x + self.map.camera.x,
+                self.cfg.GRID_VIEW_BEHIND,
+                self.cfg.GRID_VIEW_AHEAD,
+                out=frame,
+            )
+        if self._frames is not None:
+            self._push_frame()
+        observation["player_pos_x"][0] = self.player.rect.x
+        observation["player_pos_y"][0] = self.player.rect.y
+        observation["player_vel"][:] = (self.player.x_speed, self.player.y_speed)
+        return self._output_obs()
+
+    def _output_obs(self) -> dict[str, Any]:
+        observation = self.obs_buffers
+        if self.copy_obs:
+            return {key: value.copy() for key, value in observation.items()}
+        return dict(observation)
+
+    def _push_frame(self) -> None:
+        """Adds the frame drawn last to the stack.
+
+        Each frame is also written `frame_stack` slots further in the ring,
+        unless it is the last slot, so that the last `frame_stack` frames
+        always follow each other and the stack is a view of the ring.
+        """
+        k, pos = self.frame_stack, self._frame_pos
+        if pos < k - 1:
+            self._frames[pos + k] = self._frames[pos]
+        self._frame_pos = (pos + 1) % k
+        self._set_stack(self._stack())
+
+    def _fill_stack(self, frame: np.ndarray) -> None:
+        """Starts the stack over with a frame repeated."""
+        self._frames[:] = frame
+        self._frame_pos = 0
+        self._set_stack(self._frames[: self.frame_stack])
+
+    def _load_stack(self, stack: np.ndarray) -> None:
+        """Starts the stack over with given frames, oldest first."""
+        self._frames[: self.frame_stack] = stack
+        self._frame_pos = 0
+        self._set_stack(self._frames[: self.frame_stack])
+
+    def _stack(self) -> np.ndarray:
+        """Gets the stacked frames in the ring buffer, oldest first."""
+        return self._frames[self._frame_pos : self._frame_pos + self.frame_stack]
+
+    def _set_stack(self, stack: np.ndarray) -> None:
+        if self._stack_out is None:
+            self.obs_buffers[self.obs_mode] = stack
+        else:
+            np.copyto(self._stack_out, stack)
+
+    def _draw_image(self, out: np.ndarray) -> None:
+        if self.image_size == (self.cfg.SIZE_Y, self.cfg.SIZE_X) and self.image_color == "rgb":
+            if self.render_backend == "numpy":
+                self.rasterizer.draw(self.map, self.player, out=out)
+            else:
+                import pygame
+
+                self._draw_viewer()
+                pygame.pixelcopy.surface_to_array(out.swapaxes(0, 1), self.viewer)
+            return
+        if self.image_color == "palette":
+            self.rasterizer.draw_indexes(self.map, self.player, self.image_size, out=out)
+            return
+        if self._image_indexes is None:
+            self._image_indexes = np.zeros(self.image_size, dtype=np.uint8)
+        indexes = self.rasterizer.draw_indexes(
+            self.map, self.player, self.image_size, out=self._image_indexes
+        )
+        if self.image_color == "rgb":
+            np.take(self.rasterizer.palette, indexes, axis=0, out=out)
+        else:
+            np.take(self.rasterizer.gray_palette, indexes, out=out)
 
     def _get_info(self) -> dict[str, Any]:
         return {
@@ -118,18 +426,62 @@ class PlatformerEnv(Env):
     def reset(
         self, seed: int | None = None, options: dict[str, Any] | None = None
     ) -> tuple[dict[str, Any], dict[str, Any]]:
-        """Resets the state of the environment."""
+        """Resets the state of the environment.
+
+        An episode reset without a seed gets one drawn from `np_random`, so
+        that every episode can be played again from its log (see `replay`).
+        """
+        if seed is None:
+            seed = int(self.np_random.integers(2**63))
         super().reset(seed=seed)
-        self.map.reset()
-        self.map.load_chunk("init", self.cfg.START_X)
-        self.player = Player(self.cfg)
+        self.episode_seed = seed
+        # node indexes go on across episodes, see `restore_state`
+        self._log_base += len(self._log_actions) + 1
+        self._log_actions = bytearray()
+        self._log_parents = array("q")
+        self._log_node = -1
         self.time_val = 0
         self.score_val = 0.0
         self.completion = 0.0
         self.last_chunk_time = 0
         self.steps_beyond_done = None
 
-        observation = self._get_obs()
+        if self._reset_snapshot is None:
+            self.map.reset()
+            self.map.load_chunk("init", self.cfg.START_X)
+            self.player = Player(self.cfg)
+            if self._profiling:
+                self._time_phases()
+            observation = self._get_obs()
+            # every episode starts the same way, later resets copy this state back
+            self._reset_snapshot = (
+                self.map.get_state(),
+                {key: value.copy() for key, value in self.obs_buffers.items()},
+            )
+        else:
+            map_state, initial_obs = self._reset_snapshot
+            self.map.set_state(map_state)
+            self.player.rect.topleft = (self.cfg.START_X, self.cfg.START_Y)
+            self.player.x_speed = 0.0
+            self.player.y_speed = 0.0
+            for key, value in initial_obs.items():
+                np.copyto(self.obs_buffers[key], value)
+            observation = self._output_obs()
+        if self._frames is not None:
+            # the stack starts with the first frame repeated
+            self._fill_stack(self.obs_buffers[self.obs_mode][-1].copy())
+            observation = self._output_obs()
+        # the level only matters from the chunk after the init one on
+        if self.endless:
+            self.map.set_level(self._endless_level())
+        elif self.levels == "random":
+            self.map.set_level(
+                generate_level(self.np_random, self.level_length, self.map.library.names)
+            )
+        elif isinstance(self.levels, LevelPack):
+            self.map.set_level(self.levels.sample(self.np_random))
+        if self.cfg.RANDOM_GEN:
+            self.map.rng.seed(int(self.np_random.integers(2**63)))
         info = self._get_info()
 
         if self.render_mode == "human":
@@ -137,6 +489,233 @@ class PlatformerEnv(Env):
 
         return observation, info
 
+    def _endless_level(self) -> EndlessLevel:
+        seed = int(self.np_random.integers(2**63))
+        if self.levels == "random":
+            return EndlessLevel(seed, self.map.library.names)
+        if isinstance(self.levels, LevelPack):
+            return EndlessLevel.from_pack(seed, self.levels)
+        # the fixed level, put back by the reset
+        return EndlessLevel(seed, self.map.level, np.arange(len(self.map.level))[None])
+
+    def set_profiling(self, enabled: bool) -> None:
+        """Turns the timing of the phases of `step` on or off.
+
+        The phases are the methods called by `step`, replaced on the instances
+        by timed versions while the timing is on, so that it costs nothing
+        otherwise. The durations measured are kept when it is turned off.
+
+        Args:
+            enabled (bool): Whether the phases are timed.
+        """
+        self._profiling = enabled
+        if enabled:
+            self.profiler = self.profiler or PhaseProfiler()
+            self._time_phases()
+        else:
+            for obj, _, name in self._phases():
+                obj.__dict__.pop(name, None)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Gets the durations of the phases of `step` measured so far.
+
+        Returns:
+            dict[str, dict[str, Any]]: The durations by phase, see
+                `gym_platformer.utils.PhaseProfiler.stats`. Empty if the phases
+                were never timed.
+        """
+        if self.profiler is None:
+            return {}
+        return self.profiler.stats()
+
+    def _phases(self) -> list[tuple[Any, str, str]]:
+        """Lists the objects, phase names and method names of the timed phases."""
+        phases = [
+            (self.map, "level_generation", "level_generation"),
+            (self, "render", "_get_obs"),
+            (self, "termination", "_is_done"),
+            (self, "score", "_update_score"),
+        ]
+        if hasattr(self, "player"):
+            phases += [
+                (self.player, "update_speed", "update_speed"),
+                (self.player, "update_coor", "update_coor"),
+            ]
+        return phases
+
+    def _time_phases(self) -> None:
+        for obj, phase, name in self._phases():
+            method = getattr(type(obj), name).__get__(obj)
+            setattr(obj, name, self.profiler.timed(phase, method))
+
+    def clone_state(self) -> PlatformerState:
+        """Gets the state of the episode, to come back to it with `restore_state`.
+
+        The state is immutable and can be pickled. The chunks of the map and
+        the log of the actions are shared with the environment, not copied.
+        With `frame_stack`, the stacked frames are copied, to stack them again
+        after `restore_state`.
+
+        Returns:
+            PlatformerState: The state of the episode.
+        """
+        return PlatformerState(
+            self.map.get_state(),
+            self.player.rect.topleft,
+            (self.player.x_speed, self.player.y_speed),
+            self.time_val,
+            self.score_val,
+            self.completion,
+            self.last_chunk_time,
+            self.steps_beyond_done,
+            # the log of the environment is shared, the state only points into it
+            -1 if self._log_node is None else self._log_base + self._log_node,
+            None if self._frames is None else self._stack().tobytes(),
+        )
+
+    def restore_state(self, state: PlatformerState) -> None:
+        """Puts the episode back in a state given by `clone_state`.
+
+        The log of the episode goes back to the state too, unless the state is
+        from another episode, which `episode_log` then refuses to give.
+
+        Args:
+            state (PlatformerState): The state of the episode.
+        """
+        self.map.set_state(state.map_state)
+        self.player.rect.topleft = state.player_pos
+        self.player.x_speed, self.player.y_speed = state.player_vel
+        self.time_val = state.time_val
+        self.score_val = state.score_val
+        self.completion = state.completion
+        self.last_chunk_time = state.last_chunk_time
+        self.steps_beyond_done = state.steps_beyond_done
+        # the log goes back to the state, unless it comes from another episode
+        node = state.log_node - self._log_base
+        self._log_node = node if -1 <= node < len(self._log_actions) else None
+        if self._frames is not None:
+            stack = self._stack()
+            self._load_stack(np.frombuffer(state.frames, dtype=np.uint8).reshape(stack.shape))
+
+    def simulate(
+        self, action_batch: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, dict[str, np.ndarray]]:
+        """Plays sequences of actions from the current state, leaving it unchanged.
+
+        The rollouts are played at once with `gym_platformer.core.BatchPlayer`
+        and give the rewards and terminations `step` would. A rollout that
+        ends gets no reward afterwards. With `cfg.RANDOM_GEN`, the chunks
+        that are not loaded yet are unknown and rollouts only see the loaded ones.
+
+        Args:
+            action_batch (np.ndarray): Valid action indexes (KxT), one
+                sequence of `T` actions per rollout.
+
+        Returns:
+            np.ndarray: Rewards of the actions (KxT).
+            np.ndarray: Whether each rollout has ended after each action (KxT).
+            dict[str, np.ndarray]: Player state at the end of each rollout, as
+                the player entries of the observation batched over the rollouts.
+        """
+        action_batch = np.asarray(action_batch)
+        if (
+            action_batch.ndim != 2
+            or not np.issubdtype(action_batch.dtype, np.integer)
+            or ((action_batch < 0) | (action_batch >= self.action_space.n)).any()
+        ):
+            raise ValueError(f"{action_batch} invalid, expected a 2d array of actions.")
+        cfg = self.cfg
+        # one action per frame
+        action_batch = np.repeat(action_batch, self.frame_skip, axis=1)
+        n_rollouts, horizon = action_batch.shape
+
+        # lays out the level from the loaded chunks on
+        if self._lookahead_map is None:
+            self._lookahead_map = Map(cfg)
+        lookahead = self._lookahead_map
+        lookahead.set_state(self.map.get_state())
+        if not cfg.RANDOM_GEN:
+            if isinstance(lookahead.level, EndlessLevel):
+                # as far as the player can go during the rollouts
+                reach = self.map.camera.right + self.player.rect.right + horizon * cfg.SPEED_X
+                while lookahead.last_block_x < reach:
+                    key = lookahead.level[lookahead.level_idx]
+                    lookahead.load_chunk(key, lookahead.last_block_x + cfg.BLOCK_WIDTH)
+                    lookahead.level_idx += 1
+            else:
+                for key in lookahead.level[lookahead.level_idx :]:
+                    lookahead.load_chunk(key, lookahead.last_block_x + cfg.BLOCK_WIDTH)
+        grid = lookahead.grid
+        # the batched players count x from the first column of the grid
+        end_x = np.array(lookahead.end_xs) - lookahead.grid_rect.x
+        player = BatchPlayer(cfg, n_rollouts)
+        player.x[:] = self.player.rect.x
+        player.y[:] = self.player.rect.y
+        player.x_speed[:] = self.player.x_speed
+        player.y_speed[:] = self.player.y_speed
+        player.offset[:] = self.map.camera.x - lookahead.grid_rect.x
+
+        time_val = self.time_val
+        score_val = np.full(n_rollouts, self.score_val)
+        completion = np.full(n_rollouts, self.completion)
+        last_chunk_time = np.full(n_rollouts, self.last_chunk_time)
+        running = np.full(n_rollouts, self.steps_beyond_done is None)
+        rewards = np.zeros((n_rollouts, horizon))
+        terminations = np.ones((n_rollouts, horizon), dtype=bool)
+        final = np.empty((n_rollouts, 4))
+
+        def save_final(mask: np.ndarray) -> None:
+            final[mask, 0] = player.x[mask]
+            final[mask, 1] = player.y[mask]
+            final[mask, 2] = player.x_speed[mask]
+            final[mask, 3] = player.y_speed[mask]
+
+        save_final(~running)
+
+        for t in range(horizon):
+            player.step(action_batch[:, t], grid)
+            time_val += 1
+            chunks_passed = lookahead.ends_dropped + np.searchsorted(
+                end_x, player.x + player.offset
+            )
+            done = (
+                (time_val >= self.ep_duration)
+                | (chunks_passed >= lookahead.NB_CHUNK)
+                | (player.x < 0)
+                | (player.y < 0)
+                | (player.y > cfg.SIZE_Y - cfg.PLAYER_HEIGHT)
+            )
+            new_completion = self._completion(chunks_passed)
+            last_chunk_time = np.where(completion != new_completion, time_val, last_chunk_time)
+            completion = new_completion
+            time = 1 - np.where(done, last_chunk_time, time_val) / self.ep_duration
+            new_score = self._batch_score(time, completion, player.x)
+            rewards[running, t] = (new_score - score_val)[running]
+            score_val = new_score
+
+            save_final(running & done)
+            running &= ~done
+            terminations[running, t] = False
+        save_final(running)
+
+        if self.frame_skip > 1:
+            # summed in the order of `step`
+            frame_rewards = rewards.reshape(n_rollouts, -1, self.frame_skip)
+            rewards = frame_rewards[:, :, 0].copy()
+            for k in range(1, self.frame_skip):
+                rewards += frame_rewards[:, :, k]
+            terminations = terminations[:, self.frame_skip - 1 :: self.frame_skip]
+
+        return (
+            rewards,
+            terminations,
+            {
+                "player_pos_x": final[:, :1].astype(np.float32),
+                "player_pos_y": final[:, 1:2].astype(np.float32),
+                "player_vel": final[:, 2:].astype(np.float32),
+            },
+        )
+
     def step(self, action: int) -> tuple[dict[str, Any], float, bool, bool, dict[str, Any]]:
         """Updates the environment according to an action of the agent.
 
@@ -153,69 +732,205 @@ class PlatformerEnv(Env):
         # checks whether the action is valid or not
         if not self.action_space.contains(action):
             raise ValueError(f"{action} ({type(action)}) invalid.")
+        self._log_action(action)
+        chunks_passed, reward = self._skip_frames(action)
+
+        observation = self._get_obs()
+        info = self._get_info()
+
+        done = self._is_done(chunks_passed, observation)
+        reward += self._reward(chunks_passed, done)
+
+        if self.render_mode == "human":
+            self.render()
+
+        return observation, reward, done, False, info
+
+    def _update(self, action: int) -> int:
+        """Moves the player and the level, without drawing anything.
+
+        Returns:
+            int: Number of chunks passed.
+        """
         # moves the player
-        self.player.step(action, self.map.blocks)
+        self.player.step(action, self.map)
         # loads the next chunk if needed
         self.map.level_generation()
         # update time
         self.time_val += 1
         # get number of chunk passed
-        # FIXME: not efficient but works for that list length.
-        chunks_passed = 0
-        for block in self.map.blocks:
-            if block.block_type == "end" and block.rect.x < self.player.rect.x:
-                chunks_passed += 1
+        return self.map.chunks_passed(self.player.rect.x + self.map.camera.x)
 
-        observation = self._get_obs()
-        info = self._get_info()
-
-        done = (
-            self.time_val >= self.ep_duration
-            or chunks_passed >= self.map.NB_CHUNK
-            or self.observation_space.contains(observation) is False
-        )
+    def _skip_frames(self, action: int) -> tuple[int, float]:
+        """Plays an action for `frame_skip` frames, but for drawing the last one.
 
+        Returns:
+            int: Number of chunks passed after the last frame played, which is
+                the one the episode ends on if it does.
+            float: Sum of the rewards of the frames before the last one played.
+        """
+        reward = 0.0
+        for _ in range(self.frame_skip - 1):
+            chunks_passed = self._update(action)
+            if self._is_done(chunks_passed, None):
+                return chunks_passed, reward
+            reward += self._reward(chunks_passed, done=False)
+        return self._update(action), reward
+
+    def _reward(self, chunks_passed: int, done: bool) -> float:
         if not done:
-            if self.completion != chunks_passed / self.map.NB_CHUNK:
-                self.last_chunk_time = self.time_val
-            self.completion = chunks_passed / self.map.NB_CHUNK
-            time = 1 - (self.time_val / self.ep_duration)
-            # new score computation
-            new_score = self.score_fct(time, self.completion, self.player.rect.x)
-            # computes action reward
-            reward = new_score - self.score_val
-            # updates the score
-            self.score_val = new_score
-
-        elif self.steps_beyond_done is None:
+            return self._update_score(chunks_passed, ended=False)
+        if self.steps_beyond_done is None:
             # Episode just ended!
             self.steps_beyond_done = 0
+            return self._update_score(chunks_passed, ended=True)
+        if self.steps_beyond_done == 0:
+            warnings.warn(
+                "You are calling 'step()' even though this environment has already returned done = True. You "
+                "should always call 'reset()' once you receive 'done = True' -- any further steps are undefined behavior.",
+                stacklevel=3,
+                category=UserWarning,
+            )
+        self.steps_beyond_done += 1
+        return 0.0
 
-            if self.completion != chunks_passed / self.map.NB_CHUNK:
-                self.last_chunk_time = self.time_val
-            self.completion = chunks_passed / self.map.NB_CHUNK
-            time = 1 - (self.last_chunk_time / self.ep_duration)
-            # new score computation
-            new_score = self.score_fct(time, self.completion, self.player.rect.x)
-            # computes action reward
-            reward = new_score - self.score_val
-            # updates the score
-            self.score_val = new_score
-        else:
-            if self.steps_beyond_done == 0:
-                warnings.warn(
-                    "You are calling 'step()' even though this environment has already returned done = True. You "
-                    "should always call 'reset()' once you receive 'done = True' -- any further steps are undefined behavior.",
-                    stacklevel=2,
-                    category=UserWarning,
-                )
-            self.steps_beyond_done += 1
-            reward = 0.0
+    def episode_log(self) -> EpisodeLog:
+        """Gets the log of the episode so far, to play it again with `replay`.
 
-        if self.render_mode == "human":
-            self.render()
+        The actions are only logged with `record_actions`.
 
-        return observation, reward, done, False, info
+        Returns:
+            EpisodeLog: The seed of the episode, its level and its actions,
+                one byte each.
+        """
+        if not self.record_actions:
+            raise ValueError("actions are only logged with record_actions=True.")
+        if self._log_node is None:
+            raise ValueError("the episode was restored to a state of another episode.")
+        actions = bytearray()
+        node = self._log_node
+        while node >= 0:
+            actions.append(self._log_actions[node])
+            node = self._log_parents[node]
+        actions.reverse()
+        level = None if isinstance(self.map.level, EndlessLevel) else tuple(self.map.level)
+        return EpisodeLog(self.episode_seed, level, bytes(actions))
+
+    def _log_action(self, action: int) -> None:
+        """Appends an action to the log, after the last one played."""
+        if not self.record_actions or self._log_node is None:
+            return
+        self._log_actions.append(action)
+        self._log_parents.append(self._log_node)
+        self._log_node = len(self._log_actions) - 1
+
+    def replay(
+        self, log: EpisodeLog, timesteps: Iterable[int] = ()
+    ) -> tuple[np.ndarray, np.ndarray, dict[int, dict[str, Any]]]:
+        """Plays an episode again from its log, drawing only the observations asked for.
+
+        The environment is reset with the seed of the log, then its actions
+        are played without drawing the observations, but the frames stacked in
+        the ones asked for, unless `check_obs` needs them. The episode being
+        deterministic given its seed, the rewards and observations are the
+        ones of the recorded episode, as long as the environment has the same
+        arguments. The environment is left at the end of the episode.
+
+        Args:
+            log (EpisodeLog): The log of the episode, see `episode_log`.
+            timesteps (Iterable[int]): Steps whose observation is drawn, 0
+                being the one given by `reset`. Default to none.
+
+        Returns:
+            np.ndarray: Rewards of the actions.
+            np.ndarray: Whether the episode has ended after each action.
+            dict[int, dict[str, Any]]: The observations of `timesteps`.
+        """
+        timesteps = set(timesteps)
+        # steps whose frame is in the stack of a step asked for
+        drawn = {t - j for t in timesteps for j in range(self.frame_stack)}
+        observation, _ = self.reset(seed=log.seed)
+        level = None if isinstance(self.map.level, EndlessLevel) else tuple(self.map.level)
+        if level != log.level:
+            raise ValueError(
+                f"the level of the log {log.level} is not the one given by its seed {level}."
+            )
+        observations = {}
+
+        def keep(t: int, observation: dict[str, Any]) -> None:
+            # observations written in `obs_buffers` are overwritten by the next ones
+            if not self.copy_obs:
+                observation = {key: value.copy() for key, value in observation.items()}
+            observations[t] = observation
+
+        if 0 in timesteps:
+            keep(0, observation)
+        rewards = np.zeros(len(log.actions))
+        terminations = np.zeros(len(log.actions), dtype=bool)
+        for t, action in enumerate(log.actions, start=1):
+            self._log_action(action)
+            chunks_passed, reward = self._skip_frames(action)
+            observation = None
+            if t in drawn or self.check_obs:
+                observation = self._get_obs()
+                if t in timesteps:
+                    keep(t, observation)
+            terminations[t - 1] = self._is_done(chunks_passed, observation)
+            rewards[t - 1] = reward + self._reward(chunks_passed, terminations[t - 1])
+        return rewards, terminations, observations
+
+    def _is_done(self, chunks_passed: int, observation: dict[str, Any] | None) -> bool:
+        """Tells whether the episode ends, checking the observation unless it is None."""
+        return (
+            self.time_val >= self.ep_duration
+            or chunks_passed >= self.map.NB_CHUNK
+            or self.player.rect.x < 0
+            or self.player.rect.y < 0
+            or self.player.rect.y > self.cfg.SIZE_Y - self.cfg.PLAYER_HEIGHT
+            or (
+                self.check_obs
+                and observation is not None
+                and not self.observation_space.contains(observation)
+            )
+        )
+
+    def _batch_score(self, time: np.ndarray, completion: np.ndarray, x: np.ndarray) -> np.ndarray:
+        """Computes the scores of rollouts, one by one if `score_fct` is not vectorized."""
+        try:
+            scores = self.score_fct(time, completion, x)
+        except (TypeError, ValueError):
+            # e.g. `math` functions or conditions on the arguments
+            scores = None
+        if isinstance(scores, np.ndarray) and scores.shape == time.shape:
+            return scores
+        return np.array(
+            [
+                self.score_fct(*args)
+                for args in zip(time.tolist(), completion.tolist(), x.tolist(), strict=True)
+            ]
+        )
+
+    def _completion(self, chunks_passed: Any) -> Any:
+        """Gets the completion of the level, the number of chunks passed if it is endless."""
+        if math.isinf(self.map.NB_CHUNK):
+            return chunks_passed * 1.0
+        return chunks_passed / self.map.NB_CHUNK
+
+    def _update_score(self, chunks_passed: int, ended: bool) -> float:
+        """Updates the completion and the score, then returns the reward."""
+        completion = self._completion(chunks_passed)
+        if self.completion != completion:
+            self.last_chunk_time = self.time_val
+        self.completion = completion
+        # an episode that ended is timed until its last chunk passed
+        time = 1 - ((self.last_chunk_time if ended else self.time_val) / self.ep_duration)
+        # new score computation
+        new_score = self.score_fct(time, self.completion, self.player.rect.x)
+        # computes action reward
+        reward = new_score - self.score_val
+        # updates the score
+        self.score_val = new_score
+        return reward
 
     def render(self, mode: str = "human") -> np.ndarray | None:
         """Generates the environment graphical view.
@@ -225,15 +940,21 @@ class PlatformerEnv(Env):
                 - `"human"` displays a pygame window of the environment.
                 - `"rgb_array"` returns a 3d Numpy Array of the environment (HxWxC).
         """
-        # creates the window
-        self.viewer = pygame.Surface((self.cfg.SIZE_X, self.cfg.SIZE_Y))
-        # draws the background
-        self.viewer.fill(self.cfg.GREY)
-        # draws each block
-        for block in self.map.blocks:
-            pygame.draw.rect(self.viewer, self.cfg.WHITE, block.rect)
-        # draws the player
-        pygame.draw.rect(self.viewer, self.cfg.ORANGE, self.player.rect)
+        if mode not in self.metadata["render_modes"]:
+            raise ValueError(
+                f"expected 'human' or 'rgb_array' as value for mode argument \
+                    instead of '{mode}'"
+            )
+        if self.render_backend == "numpy" and mode == "rgb_array":
+            return self.rasterizer.draw(self.map, self.player).copy()
+        # pygame is only imported to show the game or to draw with it
+        import pygame
+
+        if self.render_backend == "numpy":
+            frame = self.rasterizer.draw(self.map, self.player)
+            self.viewer = pygame.surfarray.make_surface(frame.swapaxes(0, 1))
+        else:
+            self._draw_viewer()
         if mode == "human":
             if self.window is None:
                 pygame.init()
@@ -262,15 +983,27 @@ class PlatformerEnv(Env):
 
             return None
 
-        if mode == "rgb_array":
-            return pygame.surfarray.array3d(self.viewer).swapaxes(0, 1)
+        return pygame.surfarray.array3d(self.viewer).swapaxes(0, 1)
 
-        raise ValueError(
-            f"expected 'human' or 'rgb_array' as value for mode argument \
-                instead of '{mode}'"
-        )
+    def _draw_viewer(self) -> None:
+        import pygame
+
+        # creates the window
+        self.viewer = pygame.Surface((self.cfg.SIZE_X, self.cfg.SIZE_Y))
+        # draws the background
+        self.viewer.fill(self.cfg.GREY)
+        # draws each block
+        for block in self.map.blocks:
+            if block.rect.colliderect(self.map.camera):
+                pygame.draw.rect(
+                    self.viewer, self.cfg.WHITE, block.rect.move(-self.map.camera.x, 0)
+                )
+        # draws the player
+        pygame.draw.rect(self.viewer, self.cfg.ORANGE, self.player.rect)
 
     def close(self) -> None:
         if self.window is not None:
+            import pygame
+
             pygame.display.quit()
             pygame.quit()
@@ -0,0 +1,206 @@
+from collections.abc import Callable
+from typing import Any, Literal
+
+import numpy as np
+from gymnasium import spaces
+from gymnasium.utils import seeding
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+
+from gym_platformer.core import BatchPlayer, Configuration, Map
+from gym_platformer.utils import custom_score
+
+
+def level_layout(map_obj: Map) -> tuple[np.ndarray, np.ndarray]:
+    """Loads the whole level of a map and returns its geometry as arrays.
+
+    Args:
+        map_obj (Map): The map whose level is laid out. It is reset first.
+
+    Returns:
+        np.ndarray: Occupancy grid of shape `(columns, cfg.CHUNK_HEIGHT)`.
+        np.ndarray: Sorted x coordinates of the end blocks.
+    """
+    cfg = map_obj.cfg
+    map_obj.reset()
+    map_obj.load_chunk(map_obj.level[0], cfg.START_X)
+    for key in map_obj.level[1:]:
+        map_obj.load_chunk(key, map_obj.last_block_x + cfg.BLOCK_WIDTH)
+    map_obj.level_idx = len(map_obj.level)
+    return map_obj.grid.copy(), np.array(map_obj.end_xs)
+
+
+class PlatformerVectorEnv(VectorEnv):
+    """Vectorized PlatformerEnv entity.
+
+    Args:
+        num_envs (int): Number of episodes played in parallel. Defaults to 1.
+        score_fct (Callable[..., float]), default=`gym_platformer.utils.custom_score`
+            The score function that will be use to compute the overall
+            score of the agents. It is called with NumPy arrays.
+        ep_duration (float): The duration of the episodes in number of environment updates.
+            Default to 50.
+        obs_mode (str): What the observation holds besides the player state,
+            only `"state"`, nothing, as no frame is drawn. Default to `"state"`.
+
+    Description:
+        Runs `num_envs` copies of `PlatformerEnv` with the players stored as
+        NumPy arrays (see `gym_platformer.core.BatchPlayer`) so that a single
+        `step` call advances the physics of every episode at once. The level
+        is laid out once and shared by all the episodes. Finished episodes are
+        reset on the next call to `step` (next-step autoreset).
+
+    Observation:
+        The observation of `PlatformerEnv` with `obs_mode="state"`, each entry
+        batched over the episodes. See `PlatformerAsyncVectorEnv` for the
+        other observation modes.
+
+    Information:
+        The information of `PlatformerEnv`, each entry batched over the episodes.
+
+    Actions:
+        Type: MultiDiscrete([6] * num_envs)
+        One `PlatformerEnv` action per episode.
+    """
+
+    metadata = {"autoreset_mode": AutoresetMode.NEXT_STEP}
+
+    def __init__(
+        self,
+        num_envs: int = 1,
+        score_fct: Callable[..., float] = custom_score,
+        ep_duration: float = 50,
+        obs_mode: Literal["state"] = "state",
+    ) -> None:
+        if obs_mode != "state":
+            raise ValueError(
+                f"expected 'state' as value for obs_mode argument instead of '{obs_mode}', "
+                "use PlatformerAsyncVectorEnv for the other observation modes"
+            )
+        self.num_envs = num_envs
+        self.cfg = Configuration()
+        self.map = Map(self.cfg)
+        self.grid, self.end_x = level_layout(self.map)
+        self.player = BatchPlayer(self.cfg, num_envs)
+        self.score_fct = score_fct
+        self.ep_duration = ep_duration
+        self.time_val = np.zeros(num_envs, dtype=np.int64)
+        self.score_val = np.zeros(num_envs, dtype=np.float64)
+        self.completion = np.zeros(num_envs, dtype=np.float64)
+        self.last_chunk_time = np.zeros(num_envs, dtype=np.int64)
+        self.autoreset = np.zeros(num_envs, dtype=bool)
+
+        self.single_observation_space = spaces.Dict(
+            {
+                "player_pos_x": spaces.Box(low=0, high=float("inf"), shape=(1,), dtype=np.float32),
+                "player_pos_y": spaces.Box(
+                    low=0,
+                    high=self.cfg.SIZE_Y - self.cfg.PLAYER_HEIGHT,
+                    shape=(1,),
+                    dtype=np.float32,
+                ),
+                "player_vel": spaces.Box(
+                    low=-float("inf"), high=float("inf"), shape=(2,), dtype=np.float32
+                ),
+            }
+        )
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.single_action_space = spaces.Discrete(6)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+
+    def _get_obs(self) -> dict[str, np.ndarray]:
+        return {
+            "player_pos_x": self.player.x.astype(np.float32)[:, None],
+            "player_pos_y": self.player.y.astype(np.float32)[:, None],
+            "player_vel": np.stack((self.player.x_speed, self.player.y_speed), axis=1).astype(
+                np.float32
+            ),
+        }
+
+    def _get_info(self) -> dict[str, Any]:
+        return {
+            "time": self.time_val.copy(),
+            "completion": self.completion.copy(),
+            "score": self.score_val.copy(),
+        }
+
+    def _reset_envs(self, mask: np.ndarray) -> None:
+        self.player.reset(mask)
+        self.time_val[mask] = 0
+        self.score_val[mask] = 0.0
+        self.completion[mask] = 0.0
+        self.last_chunk_time[mask] = 0
+
+    def reset(
+        self, *, seed: int | None = None, options: dict[str, Any] | None = None
+    ) -> tuple[dict[str, np.ndarray], dict[str, Any]]:
+        """Resets the state of every episode."""
+        if seed is not None:
+            self._np_random, self._np_random_seed = seeding.np_random(seed)
+        self._reset_envs(slice(None))
+        self.autoreset[:] = False
+        return self._get_obs(), self._get_info()
+
+    def step(
+        self, actions: np.ndarray
+    ) -> tuple[dict[str, np.ndarray], np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]:
+        """Updates every episode according to the actions of the agents.
+
+        Args:
+            actions (np.ndarray): One valid action index per episode.
+
+        Returns:
+            dict[str, np.ndarray]: Observations of the episodes.
+            np.ndarray: Rewards for making the actions.
+            np.ndarray: Indicates episodes completion.
+            np.ndarray: Indicates episodes truncation.
+            dict[str, Any]: Additional information about the episodes.
+        """
+        actions = np.asarray(actions)
+        if not self.action_space.contains(actions):
+            raise ValueError(f"{actions} ({type(actions)}) invalid.")
+        # moves the players
+        self.player.step(actions, self.grid)
+        # update time
+        self.time_val += 1
+        # get number of chunk passed
+        chunks_passed = np.searchsorted(self.end_x, self.player.x + self.player.offset)
+
+        info = self._get_info()
+
+        done = (
+            (self.time_val >= self.ep_duration)
+            | (chunks_passed >= self.map.NB_CHUNK)
+            | (self.player.x < 0)
+            | (self.player.y < 0)
+            | (self.player.y > self.cfg.SIZE_Y - self.cfg.PLAYER_HEIGHT)
+        )
+
+        completion = chunks_passed / self.map.NB_CHUNK
+        self.last_chunk_time = np.where(
+            self.completion != completion, self.time_val, self.last_chunk_time
+        )
+        self.completion = completion
+        time = 1 - np.where(done, self.last_chunk_time, self.time_val) / self.ep_duration
+        # new score computation
+        new_score = self.score_fct(time, self.completion, self.player.x)
+        # computes action reward
+        reward = new_score - self.score_val
+        # updates the score
+        self.score_val = new_score
+
+        # episodes that ended on the previous step start over
+        self._reset_envs(self.autoreset)
+        for value in info.values():
+            value[self.autoreset] = 0
+        reward[self.autoreset] = 0.0
+        done[self.autoreset] = False
+        self.autoreset = done
+
+        return (
+            self._get_obs(),
+            reward,
+            done,
+            np.zeros(self.num_envs, dtype=bool),
+            info,
+        )
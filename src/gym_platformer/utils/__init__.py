@@ -1,2 +1,3 @@
 # flake8: noqa
 from .scores import custom_score
+from .profiling import PhaseProfiler
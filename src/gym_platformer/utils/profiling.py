@@ -0,0 +1,76 @@
+import time
+from collections.abc import Callable
+from typing import Any
+
+
+class PhaseProfiler:
+    # durations are counted in buckets of powers of two nanoseconds
+    N_BUCKETS = 40
+
+    def __init__(self) -> None:
+        """Aggregates the durations of the phases of the environment updates.
+
+        Each phase keeps a call count, a total duration and a histogram of
+        the durations with one bucket per power of two nanoseconds.
+        """
+        self.counts: dict[str, int] = {}
+        self.totals: dict[str, int] = {}
+        self.histograms: dict[str, list[int]] = {}
+
+    def timed(self, phase: str, function: Callable[..., Any]) -> Callable[..., Any]:
+        """Wraps a function so that its calls are timed as a phase.
+
+        Args:
+            phase (str): Name of the phase.
+            function (Callable[..., Any]): The function to time.
+
+        Returns:
+            Callable[..., Any]: The timed function.
+        """
+        self.counts.setdefault(phase, 0)
+        self.totals.setdefault(phase, 0)
+        histogram = self.histograms.setdefault(phase, [0] * self.N_BUCKETS)
+        counts, totals = self.counts, self.totals
+
+        def timed_function(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter_ns()
+            result = function(*args, **kwargs)
+            duration = time.perf_counter_ns() - start
+            counts[phase] += 1
+            totals[phase] += duration
+            histogram[min(duration.bit_length(), self.N_BUCKETS - 1)] += 1
+            return result
+
+        return timed_function
+
+    def clear(self) -> None:
+        """Forgets the durations measured so far."""
+        for phase, histogram in self.histograms.items():
+            self.counts[phase] = 0
+            self.totals[phase] = 0
+            histogram[:] = [0] * self.N_BUCKETS
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Gets the durations measured so far.
+
+        Returns:
+            dict[str, dict[str, Any]]: For each phase, the number of calls,
+                the total and mean durations in microseconds and the histogram
+                of the durations, as the number of calls shorter than each
+                power of two nanoseconds, given in microseconds (only the
+                non-empty buckets).
+        """
+        stats = {}
+        for phase, count in self.counts.items():
+            total = self.totals[phase] / 1e3
+            stats[phase] = {
+                "count": count,
+                "total_us": total,
+                "mean_us": total / count if count else 0.0,
+                "histogram_us": {
+                    2**bucket / 1e3: n_calls
+                    for bucket, n_calls in enumerate(self.histograms[phase])
+                    if n_calls
+                },
+            }
+        return stats
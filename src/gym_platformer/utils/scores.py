@@ -4,7 +4,8 @@ def custom_score(time: float, completion: float, x: int) -> float:
 
     Args:
         time (float): Play time in second.
-        completion (float): Completion rate of the map (between 0 and 1).
+        completion (float): Completion rate of the map (between 0 and 1), or
+            number of chunks passed in an endless level.
         x (int): Distance traveled.
 
     Returns:
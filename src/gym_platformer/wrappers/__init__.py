@@ -0,0 +1,2 @@
+# flake8: noqa
+from gym_platformer.wrappers.trajectory_recorder import TrajectoryReader, TrajectoryRecorder
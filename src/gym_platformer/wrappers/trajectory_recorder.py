@@ -0,0 +1,329 @@
+import json
+import math
+import os
+import queue
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Literal
+
+import gymnasium as gym
+import numpy as np
+
+# action of the records of the observations given by `reset`
+RESET_ACTION = -1
+
+
+def _write_frames(
+    directory: Path, compressed: list[bytes], shape: tuple[int, ...], dtype: np.dtype
+) -> None:
+    """Writes frames compressed one by one, so that any of them can be read alone."""
+    offsets = np.zeros(len(compressed) + 1, dtype=np.uint64)
+    offsets[1:] = np.cumsum([len(frame) for frame in compressed])
+    (directory / "image.bin").write_bytes(b"".join(compressed))
+    (directory / "image.json").write_text(
+        json.dumps(
+            {
+                "shape": (len(compressed), *shape),
+                "dtype": dtype.str,
+                "offsets": offsets.tolist(),
+            }
+        )
+    )
+
+
+class _CompressedFrames:
+    """Frames written by `_write_frames`, indexed like an array of them."""
+
+    def __init__(self, directory: Path) -> None:
+        meta = json.loads((directory / "image.json").read_text())
+        self.shape = tuple(meta["shape"])
+        self.dtype = np.dtype(meta["dtype"])
+        self.offsets = meta["offsets"]
+        self.data = np.memmap(directory / "image.bin", dtype=np.uint8, mode="r")
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, index: Any) -> np.ndarray:
+        positions = np.arange(len(self))[index]
+        frames = np.empty((positions.size, *self.shape[1:]), dtype=self.dtype)
+        for frame, position in zip(frames, positions.reshape(-1).tolist(), strict=True):
+            start, stop = self.offsets[position], self.offsets[position + 1]
+            frame.reshape(-1).view(np.uint8)[:] = np.frombuffer(
+                zlib.decompress(self.data[start:stop]), dtype=np.uint8
+            )
+        return frames.reshape((*positions.shape, *self.shape[1:]))
+
+
+class TrajectoryRecorder(gym.Wrapper):
+    """Records the transitions of an environment into files, as it is played.
+
+    Args:
+        env (gym.Env): The environment, e.g. a `PlatformerEnv`, with a `Dict`
+            observation space of `Box` entries.
+        path (str | os.PathLike): Directory the records are written into,
+            created if needed. It is read with `TrajectoryReader`.
+        chunk_size (int): Number of records of each chunk of files. Default to
+            4096.
+        chunk_bytes (int): Size in bytes of the arrays of a chunk in memory,
+            which lowers the number of records of a chunk of raw images.
+            Default to 64 MiB.
+        images (str): How the `"image"` entry of the observations is stored.
+            `"raw"` keeps the array as is, memory-mapped by the reader,
+            `"compressed"` deflates each image on its own, which suits the few
+            flat colors of the game window (a few kilobytes an image) while
+            the reader still decompresses only the images asked for, and
+            `"none"` drops it. Default to `"compressed"`.
+        max_pending (int): Number of full chunks waiting to be written before
+            `step` waits for the writer. Default to 4.
+
+    Description:
+        Every observation given by `reset` and `step` is a record, along with
+        the action, the reward, the termination and the truncation of the
+        step (`RESET_ACTION`, 0 and False for a reset), so that a transition is
+        a record and the one before. Records are copied into preallocated
+        arrays, compressed images being kept as bytes, handed to a background
+        thread once a chunk of them is gathered and written as one `.npy` file
+        per entry in a directory per chunk. The memory taken by the records
+        thus depends on `chunk_bytes` and `max_pending`, not on the length of
+        the recording. The records still in memory are written on `flush` and
+        `close`.
+    """
+
+    def __init__(
+        self,
+        env: gym.Env,
+        path: str | os.PathLike,
+        chunk_size: int = 4096,
+        chunk_bytes: int = 2**26,
+        images: Literal["raw", "compressed", "none"] = "compressed",
+        max_pending: int = 4,
+    ) -> None:
+        super().__init__(env)
+        if images not in ("raw", "compressed", "none"):
+            raise ValueError(
+                f"expected 'raw', 'compressed' or 'none' as value for images argument "
+                f"instead of '{images}'"
+            )
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.images = images
+        self.fields: dict[str, tuple[tuple[int, ...], np.dtype]] = {
+            key: (space.shape, space.dtype)
+            for key, space in env.observation_space.items()
+            if key != "image" or images == "raw"
+        }
+        image_space = env.observation_space.get("image")
+        # images compressed as they are recorded, see `_record`
+        self._frames: list[bytes] | None = None
+        if image_space is not None and images == "compressed":
+            self._frame_field = (image_space.shape, image_space.dtype)
+            self._frames = []
+        self.fields.update(
+            action=((), np.dtype(np.int16)),
+            reward=((), np.dtype(np.float64)),
+            terminated=((), np.dtype(bool)),
+            truncated=((), np.dtype(bool)),
+        )
+        record_bytes = sum(
+            math.prod(shape) * dtype.itemsize for shape, dtype in self.fields.values()
+        )
+        self.chunk_size = max(min(chunk_size, chunk_bytes // record_bytes), 1)
+        self._chunk = self._new_chunk()
+        self._n_records = 0
+        self._n_chunks = len(list(self.path.glob("chunk_*[0-9]")))
+        self._pending: queue.Queue = queue.Queue(max_pending)
+        self._error: BaseException | None = None
+        self._writer = threading.Thread(target=self._write_chunks, daemon=True)
+        self._writer.start()
+
+    def _new_chunk(self) -> dict[str, np.ndarray]:
+        return {
+            key: np.empty((self.chunk_size, *shape), dtype=dtype)
+            for key, (shape, dtype) in self.fields.items()
+        }
+
+    def reset(
+        self, *, seed: int | None = None, options: dict[str, Any] | None = None
+    ) -> tuple[Any, dict[str, Any]]:
+        """Resets the environment and records its observation."""
+        observation, info = self.env.reset(seed=seed, options=options)
+        self._record(observation, RESET_ACTION, 0.0, False, False)
+        return observation, info
+
+    def step(self, action: int) -> tuple[Any, float, bool, bool, dict[str, Any]]:
+        """Steps the environment and records the transition."""
+        observation, reward, terminated, truncated, info = self.env.step(action)
+        self._record(observation, action, reward, terminated, truncated)
+        return observation, reward, terminated, truncated, info
+
+    def _record(
+        self,
+        observation: dict[str, Any],
+        action: int,
+        reward: float,
+        terminated: bool,
+        truncated: bool,
+    ) -> None:
+        chunk, n = self._chunk, self._n_records
+        for key, value in observation.items():
+            if key in chunk:
+                chunk[key][n] = value
+        if self._frames is not None:
+            self._frames.append(zlib.compress(observation["image"].tobytes(), 1))
+        chunk["action"][n] = action
+        chunk["reward"][n] = reward
+        chunk["terminated"][n] = terminated
+        chunk["truncated"][n] = truncated
+        self._n_records += 1
+        if self._n_records == self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Hands the records in memory to the writer."""
+        if self._error is not None:
+            raise RuntimeError("the trajectory writer failed") from self._error
+        if self._n_records == 0:
+            return
+        records: dict[str, Any] = {
+            key: value[: self._n_records] for key, value in self._chunk.items()
+        }
+        if self._frames is not None:
+            records["image"] = self._frames
+            self._frames = []
+        self._pending.put((self.path / f"chunk_{self._n_chunks:06d}", records))
+        self._n_chunks += 1
+        # the writer owns the arrays handed to it
+        self._chunk = self._new_chunk()
+        self._n_records = 0
+
+    def _write_chunks(self) -> None:
+        while True:
+            item = self._pending.get()
+            if item is None:
+                break
+            directory, records = item
+            try:
+                # written under another name first, so readers never see half a chunk
+                partial = directory.with_name(directory.name + ".partial")
+                partial.mkdir()
+                for key, value in records.items():
+                    if key == "image" and self.images == "compressed":
+                        _write_frames(partial, value, *self._frame_field)
+                    else:
+                        np.save(partial / f"{key}.npy", value)
+                partial.rename(directory)
+            except Exception as error:  # noqa: BLE001
+                # raised by the next call to `flush`
+                self._error = error
+            finally:
+                self._pending.task_done()
+
+    def close(self) -> None:
+        """Writes the records left, waits for the writer and closes the environment."""
+        if self._writer.is_alive():
+            try:
+                self.flush()
+            finally:
+                self._pending.put(None)
+                self._writer.join()
+        if self._error is not None:
+            raise RuntimeError("the trajectory writer failed") from self._error
+        super().close()
+
+
+class TrajectoryReader:
+    def __init__(self, path: str | os.PathLike) -> None:
+        """Records written by `TrajectoryRecorder`.
+
+        The files are memory-mapped, so only the records read are loaded
+        (and decompressed for compressed images).
+
+        Args:
+            path (str | os.PathLike): Directory of the records.
+        """
+        self.path = Path(path)
+        self.chunks: list[dict[str, Any]] = []
+        for directory in sorted(self.path.glob("chunk_*[0-9]")):
+            chunk = {file.stem: np.load(file, mmap_mode="r") for file in directory.glob("*.npy")}
+            if (directory / "image.json").exists():
+                chunk["image"] = _CompressedFrames(directory)
+            self.chunks.append(chunk)
+        if not self.chunks:
+            raise ValueError(f"no records in {self.path}.")
+        sizes = [len(chunk["action"]) for chunk in self.chunks]
+        # index of the first record of each chunk
+        self.starts = np.concatenate([[0], np.cumsum(sizes)])
+        self._ends: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        """Gets the number of records."""
+        return int(self.starts[-1])
+
+    @property
+    def keys(self) -> list[str]:
+        """Entries of the records."""
+        return sorted(self.chunks[0])
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"record {index} out of {len(self)} records.")
+        index %= len(self)
+        chunk_idx = int(np.searchsorted(self.starts, index, side="right")) - 1
+        return chunk_idx, index - int(self.starts[chunk_idx])
+
+    def __getitem__(self, index: int) -> dict[str, Any]:
+        """Gets a record, its entries by name."""
+        chunk_idx, position = self._locate(index)
+        return {key: np.array(value[position]) for key, value in self.chunks[chunk_idx].items()}
+
+    def gather(self, indexes: np.ndarray) -> dict[str, np.ndarray]:
+        """Gets records, each entry batched.
+
+        Args:
+            indexes (np.ndarray): Indexes of the records.
+
+        Returns:
+            dict[str, np.ndarray]: The entries of the records by name.
+        """
+        indexes = np.asarray(indexes)
+        chunk_ids = np.searchsorted(self.starts, indexes, side="right") - 1
+        batch = {
+            key: np.empty((len(indexes), *value.shape[1:]), dtype=value.dtype)
+            for key, value in self.chunks[0].items()
+        }
+        # reads each chunk once, the memory-mapped files only for the records asked for
+        for chunk_idx in np.unique(chunk_ids).tolist():
+            mask = chunk_ids == chunk_idx
+            positions = indexes[mask] - self.starts[chunk_idx]
+            for key, value in self.chunks[chunk_idx].items():
+                batch[key][mask] = value[positions]
+        return batch
+
+    def sample(self, batch_size: int, rng: np.random.Generator) -> dict[str, np.ndarray]:
+        """Draws transitions at random.
+
+        Args:
+            batch_size (int): Number of transitions.
+            rng (np.random.Generator): The random generator drawing them.
+
+        Returns:
+            dict[str, np.ndarray]: The entries of the records the transitions
+                end on, batched, and the observation entries of the records
+                before them, prefixed by `"previous_"`.
+        """
+        if self._ends is None:
+            # a transition ends on any record that is not a reset
+            actions = np.concatenate([chunk["action"] for chunk in self.chunks])
+            self._ends = np.flatnonzero(actions != RESET_ACTION)
+            self._ends = self._ends[self._ends > 0]
+        if len(self._ends) == 0:
+            raise ValueError(f"no transition in {self.path}.")
+        indexes = rng.choice(self._ends, size=batch_size)
+        batch = self.gather(indexes)
+        previous = self.gather(indexes - 1)
+        for key in self.keys:
+            if key not in ("action", "reward", "terminated", "truncated"):
+                batch[f"previous_{key}"] = previous[key]
+        return batch
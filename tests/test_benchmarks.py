@@ -0,0 +1,29 @@
+import pytest
+
+from benchmarks import BASELINE_PATH, compare, environment, load_results, run_benchmarks
+
+
+def test_compare() -> None:
+    baseline = {"step.steps_per_sec": 100.0, "reset.p50_ms": 1.0, "memory.growth_bytes": 0.0}
+    assert compare(baseline, baseline) == []
+    regressions = compare(
+        {"step.steps_per_sec": 60.0, "reset.p50_ms": 1.2, "memory.growth_bytes": 2e6}, baseline
+    )
+    assert [regression.split(":")[0] for regression in regressions] == [
+        "step.steps_per_sec",
+        "memory.growth_bytes",
+    ]
+
+
+@pytest.mark.benchmark
+def test_throughput() -> None:
+    baseline = load_results(BASELINE_PATH)
+    # speeds only compare on the host and the versions the baseline was measured with
+    current = environment()
+    if any(baseline.get(key) != value for key, value in current.items()):
+        pytest.skip(
+            "benchmarks/baseline.json was measured elsewhere, see the README to regenerate it"
+        )
+    metrics = run_benchmarks(quick=True)["metrics"]
+    throughput = {name: value for name, value in metrics.items() if name.endswith("_per_sec")}
+    assert compare(throughput, baseline["metrics"]) == []
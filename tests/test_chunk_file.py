@@ -0,0 +1,66 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from gym_platformer.core import ChunkFile, Configuration, Map, write_chunk_file
+from gym_platformer.core.chunk_file import open_chunk_file
+from gym_platformer.core.chunk_library import chunk_library
+from gym_platformer.core.chunks import chunks
+
+
+def test_chunk_file(tmp_path: Path) -> None:
+    levels = [["init", "chunk_2", "chunk_10"], ["init"]]
+    path = write_chunk_file(tmp_path / "chunks.bin", chunks, levels)
+    chunk_file = ChunkFile(path)
+    assert len(chunk_file) == len(chunks)
+    assert sorted(chunk_file) == sorted(chunks)
+    assert chunk_file.chunk_height == 16
+    for name, rows in chunks.items():
+        assert name in chunk_file
+        assert chunk_file[name] == tuple(rows)
+    assert "chunk_99" not in chunk_file
+    with pytest.raises(KeyError):
+        chunk_file["chunk_99"]
+    assert chunk_file.n_levels == 2
+    assert chunk_file.level(0) == levels[0]
+    assert chunk_file.level(-1) == levels[1]
+    assert open_chunk_file(path) is open_chunk_file(tmp_path / "." / "chunks.bin")
+
+    with pytest.raises(ValueError):
+        write_chunk_file(tmp_path / "invalid.bin", {"a": [" W", "W"]})
+    with pytest.raises(ValueError):
+        write_chunk_file(tmp_path / "invalid.bin", {"a": [" X"]})
+    with pytest.raises(ValueError):
+        write_chunk_file(tmp_path / "invalid.bin", {"a": [" W"]}, [["b"]])
+    with pytest.raises(ValueError):
+        ChunkFile(Path(__file__))
+
+
+def test_map_chunk_file(tmp_path: Path) -> None:
+    level = ["init", "chunk_3", "chunk_1"]
+    path = write_chunk_file(tmp_path / "chunks.bin", chunks, [level])
+    cfg = Configuration()
+    cfg.CHUNK_FILE = str(path)
+    map_obj = Map(cfg)
+    assert map_obj.level == level
+    assert map_obj.library is chunk_library(cfg)
+    assert map_obj.library is not chunk_library(Configuration())
+    # only the chunks loaded are compiled
+    map_obj.load_chunk("init", cfg.START_X)
+    assert list(map_obj.library._layouts) == ["init"]
+    assert map_obj.library["init"] is chunk_library(Configuration())["init"]
+
+    builtin = Map(Configuration())
+    builtin.set_level(level)
+    for map_ in (map_obj, builtin):
+        map_.reset()
+        map_.load_chunk("init", cfg.START_X)
+        while map_.level_generation():
+            pass
+    np.testing.assert_array_equal(map_obj.grid, builtin.grid)
+
+    cfg = Configuration(chunk_height=8)
+    cfg.CHUNK_FILE = str(path)
+    with pytest.raises(ValueError):
+        Map(cfg)
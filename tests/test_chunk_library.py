@@ -0,0 +1,50 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from gym_platformer.core import Configuration, Map
+from gym_platformer.core.chunk_library import ChunkCache, chunk_library, compile_chunk
+
+
+def test_compile_chunk() -> None:
+    cfg = Configuration(chunk_height=3)
+    compiled = compile_chunk([" W", "  ", "WE"], cfg)
+    assert compiled.width == 2 * cfg.BLOCK_WIDTH
+    np.testing.assert_array_equal(compiled.tiles, [[False, False, True], [True, False, True]])
+    assert compiled.block_x == (0, cfg.BLOCK_WIDTH, cfg.BLOCK_WIDTH)
+    assert compiled.block_y == (2 * cfg.BLOCK_HEIGHT, 0, 2 * cfg.BLOCK_HEIGHT)
+    assert compiled.block_end == (False, False, True)
+    assert compiled.end_x == (cfg.BLOCK_WIDTH,)
+    with pytest.raises(ValueError):
+        compiled.tiles[0, 0] = True
+    assert compile_chunk((" W", "  ", "WE"), Configuration(chunk_height=3)) is compiled
+    assert pickle.loads(pickle.dumps(compiled)) is compiled  # noqa: S301
+
+
+def test_chunk_library() -> None:
+    cfg = Configuration()
+    library = chunk_library(cfg)
+    assert Map(cfg).library is library
+    assert Map(Configuration()).library is library
+
+    map_obj = Map(cfg)
+    map_obj.load_chunk("chunk_1", cfg.START_X)
+    blocks = [(block.rect.x - cfg.START_X, block.rect.y) for block in map_obj.blocks]
+    layout = library["chunk_1"]
+    assert blocks == [
+        (x, map_obj.grid_rect.y + y) for x, y in zip(layout.block_x, layout.block_y, strict=True)
+    ]
+    assert map_obj.last_block_x == cfg.START_X + layout.block_x[-1]
+
+
+def test_chunk_cache() -> None:
+    cache: ChunkCache[int] = ChunkCache(maxsize=2)
+    assert cache.put("a", 1) == 1
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    # "b" was used least recently
+    assert list(cache) == ["a", "c"]
+    assert cache.get("b") is None
+    assert len(cache) == 2
@@ -0,0 +1,67 @@
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from gym_platformer.core import EndlessLevel, LevelPack, generate_level_pack
+from gym_platformer.core.chunks import chunks
+from gym_platformer.core.level_pack import LEVELS_PER_SEED, generate_level, generate_levels
+
+
+def test_generate_levels() -> None:
+    levels = generate_levels(np.random.default_rng(0), 100, 6)
+    assert levels.shape == (100, 6)
+    names = np.array(list(chunks))
+    assert (names[levels[:, 0]] == "init").all()
+    assert "init" not in names[levels[:, 1:]]
+    np.testing.assert_array_equal(levels, generate_levels(np.random.default_rng(0), 100, 6))
+    level = generate_level(np.random.default_rng(0), 6)
+    assert level == names[levels[0]].tolist()
+
+
+def test_level_pack(tmp_path: Path) -> None:
+    n_levels = LEVELS_PER_SEED + 10
+    path = generate_level_pack(tmp_path / "pack.npz", n_levels, n_chunks=5, seed=1)
+    parallel_path = generate_level_pack(
+        tmp_path / "parallel_pack.npz", n_levels, n_chunks=5, seed=1, num_workers=2
+    )
+    pack = LevelPack(path)
+    assert len(pack) == n_levels
+    np.testing.assert_array_equal(pack.levels, LevelPack(parallel_path).levels)
+    assert pack.level(0)[0] == "init"
+    assert len(pack.level(-1)) == 5
+    assert pack.sample(np.random.default_rng(2)) == pack.sample(np.random.default_rng(2))
+
+    np.savez(tmp_path / "invalid.npz", names=np.array(["init", "chunk_0"]), levels=pack.levels)
+    with pytest.raises(ValueError):
+        LevelPack(tmp_path / "invalid.npz")
+
+
+def test_endless_level(tmp_path: Path) -> None:
+    names = list(chunks)
+    level = EndlessLevel(0, names)
+    first = [level[i] for i in range(3 * EndlessLevel.BLOCK_SIZE)]
+    assert first[0] == "init"
+    assert "init" not in first[1:]
+    # any chunk is found again from the seed, whatever the previous ones asked for
+    assert [EndlessLevel(0, names)[i] for i in range(600, 0, -1)] == first[600:0:-1]
+    assert [EndlessLevel(1, names)[i] for i in range(len(first))] != first
+
+    pack = LevelPack(generate_level_pack(tmp_path / "pack.npz", 10, n_chunks=4, seed=0))
+    level = EndlessLevel(0, pack.names, pack.levels)
+    for block in range(5):
+        assert [level[1 + 3 * block + i] for i in range(3)] in [
+            pack.level(i)[1:] for i in range(len(pack))
+        ]
+    with pytest.raises(ValueError):
+        EndlessLevel(0, pack.names, pack.levels[:, :1])
+
+    # the pack is pickled as its path, not its levels
+    level = EndlessLevel.from_pack(0, pack)
+    first = [level[i] for i in range(20)]
+    pickled = pickle.dumps(level)
+    assert len(pickled) < 1000
+    level = pickle.loads(pickled)  # noqa: S301
+    assert level.pack is pack
+    assert [level[i] for i in range(20)] == first
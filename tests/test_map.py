@@ -1,6 +1,9 @@
+import numpy as np
+import pygame
 import pytest
 
 from gym_platformer.core import Configuration, Map
+from gym_platformer.core.map import round_half_away
 
 
 def test_reset() -> None:
@@ -67,3 +70,110 @@ def test_level_generation() -> None:
     map_obj = Map(cfg)
     map_obj.load_chunk("init", 0)
     assert map_obj.level_generation()
+
+
+def test_grid() -> None:
+    cfg = Configuration(chunk_height=3)
+    map_obj = Map(cfg)
+    map_obj.load_chunk([" W", "  ", "WE"], 2 * cfg.BLOCK_WIDTH)
+    map_obj.load_chunk(["W", " ", " "], cfg.BLOCK_WIDTH)
+    assert map_obj.grid_rect.x == cfg.BLOCK_WIDTH
+    np.testing.assert_array_equal(
+        map_obj.grid, [[True, False, False], [False, False, True], [True, False, True]]
+    )
+    with pytest.raises(ValueError):
+        map_obj.load_chunk(["W", " ", " "], 1)
+
+    map_obj.scroll(cfg.BLOCK_WIDTH)
+    assert map_obj.blocks[0].rect.x == 2 * cfg.BLOCK_WIDTH
+    rect = pygame.Rect(0, map_obj.grid_rect.y, 3 * cfg.BLOCK_WIDTH, 3 * cfg.BLOCK_HEIGHT)
+    nearby = [(block.x, block.y) for block in map_obj.nearby_blocks(rect)]
+    assert nearby == sorted(
+        (block.rect.x - cfg.BLOCK_WIDTH, block.rect.y) for block in map_obj.blocks
+    )
+    rect.width = 1
+    assert [(block.x, block.y) for block in map_obj.nearby_blocks(rect)] == nearby[:1]
+    map_obj.reset()
+    assert len(map_obj.grid) == 0
+    assert map_obj.camera.x == 0
+
+
+def test_drop_passed_chunks() -> None:
+    cfg = Configuration()
+    map_obj = Map(cfg)
+    map_obj.load_chunk("init", 0)
+    while map_obj.level_generation():
+        pass
+    assert len(map_obj.live_chunks) == 4
+    map_obj.scroll(map_obj.live_chunks[1].right)
+    assert map_obj.drop_passed_chunks() == 2
+    assert map_obj.ends_dropped == 1
+    assert map_obj.grid_rect.x == map_obj.live_chunks[0].left == map_obj.camera.x
+    grid = np.zeros_like(map_obj.grid)
+    for block in map_obj.blocks:
+        grid[
+            (block.rect.x - map_obj.grid_rect.x) // cfg.BLOCK_WIDTH,
+            (block.rect.y - map_obj.grid_rect.y) // cfg.BLOCK_HEIGHT,
+        ] = True
+    np.testing.assert_array_equal(grid, map_obj.grid)
+
+    map_obj.scroll(10 * cfg.SIZE_X)
+    assert map_obj.drop_passed_chunks() == 1
+    assert len(map_obj.live_chunks) == 1
+    assert map_obj.blocks[-1].block_type == "end"
+
+
+def test_map_state() -> None:
+    cfg = Configuration()
+    map_obj = Map(cfg)
+    map_obj.load_chunk("init", 0)
+    for _ in range(3):
+        map_obj.level_generation()
+    map_obj.scroll(map_obj.live_chunks[1].right)
+    map_obj.drop_passed_chunks()
+    map_obj.chunks_passed(map_obj.camera.right)
+    state = map_obj.get_state()
+    grid, end_xs = map_obj.grid.copy(), list(map_obj.end_xs)
+
+    map_obj.reset()
+    map_obj.load_chunk("chunk_5", 0)
+    map_obj.set_state(state)
+    assert map_obj.get_state() == state
+    np.testing.assert_array_equal(map_obj.grid, grid)
+    assert map_obj.end_xs == end_xs
+    assert map_obj.grid_rect.x == state.live_chunks[0].left
+
+
+def test_chunks_passed() -> None:
+    cfg = Configuration()
+    map_obj = Map(cfg)
+    map_obj.load_chunk("init", 0)
+    while map_obj.level_generation():
+        pass
+    first_end, second_end = map_obj.end_xs[:2]
+    assert map_obj.chunks_passed(first_end) == 0
+    assert map_obj.chunks_passed(first_end + 1) == 1
+    assert map_obj.chunks_passed(second_end + 1) == 2
+    assert map_obj.chunks_passed(first_end) == 0
+    map_obj.scroll(second_end + cfg.BLOCK_WIDTH)
+    assert map_obj.drop_passed_chunks() == 3
+    assert map_obj.ends_dropped == 2
+    assert map_obj.chunks_passed(second_end + cfg.BLOCK_WIDTH) == 2
+
+
+def test_local_grid() -> None:
+    cfg = Configuration(chunk_height=3)
+    map_obj = Map(cfg)
+    map_obj.load_chunk(["W  ", " W ", "WWE"], cfg.BLOCK_WIDTH)
+    window = map_obj.local_grid(2 * cfg.BLOCK_WIDTH + 3, 2, 2)
+    assert window.dtype == np.uint8
+    np.testing.assert_array_equal(window, [[0, 1, 0, 0, 0], [0, 0, 1, 0, 0], [0, 1, 1, 1, 0]])
+
+
+def test_round_half_away() -> None:
+    rect = pygame.Rect(0, 0, 1, 1)
+    for value in (0.0, 0.4, 0.5, 1.5, 2.5, -0.5, -1.5, -2.6, 7.49999, 1e6 + 0.5):
+        assert round_half_away(value) == round_half_away(-value) * (1 if value == 0 else -1)
+        rect.x = value
+        # what pygame 2 does
+        assert round_half_away(value) == rect.x
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from gym_platformer.envs import PlatformerAsyncVectorEnv, PlatformerEnv
+
+
+def test_step_matches_platformer_env() -> None:
+    num_envs = 3
+    rng = np.random.default_rng(0)
+    kwargs = {"ep_duration": 40, "image_size": (84, 84), "image_color": "grayscale"}
+    vec_env = PlatformerAsyncVectorEnv(num_envs=num_envs, num_workers=2, **kwargs)
+    envs = [PlatformerEnv(**kwargs) for _ in range(num_envs)]
+    observations, infos = vec_env.reset(seed=0)
+    for i, env in enumerate(envs):
+        observation, info = env.reset()
+        np.testing.assert_array_equal(observations["image"][i], observation["image"])
+    done = np.zeros(num_envs, dtype=bool)
+
+    for _ in range(60):
+        actions = rng.choice(6, size=num_envs, p=[0.1, 0.35, 0.05, 0.35, 0.1, 0.05])
+        observations, rewards, terminations, truncations, infos = vec_env.step(actions)
+        assert not truncations.any()
+        for i, env in enumerate(envs):
+            if done[i]:
+                observation, info = env.reset()
+                reward, terminated = 0.0, False
+            else:
+                observation, reward, terminated, _, info = env.step(int(actions[i]))
+            for key, value in observation.items():
+                np.testing.assert_array_equal(observations[key][i], value)
+            assert rewards[i] == reward
+            assert terminations[i] == terminated
+            for key in ("time", "completion", "score"):
+                assert infos[key][i] == info[key]
+        done = terminations
+    assert vec_env.observation_space.contains(observations)
+    vec_env.close()
+
+
+def test_worker_error() -> None:
+    vec_env = PlatformerAsyncVectorEnv(num_envs=2, num_workers=2, obs_mode="state", copy=False)
+    observations, _ = vec_env.reset()
+    assert observations["player_pos_x"] is vec_env.observations["player_pos_x"]
+    with pytest.raises(ValueError):
+        vec_env.step(np.array([0, 6]))
+    for pipe in vec_env.pipes:
+        pipe.send(("unknown", None))
+    with pytest.raises(RuntimeError):
+        vec_env._receive()
+    vec_env.close()
+
+
+def test_copy_obs() -> None:
+    with pytest.raises(ValueError, match="copy_obs"):
+        PlatformerAsyncVectorEnv(num_envs=2, obs_mode="state", copy_obs=False)
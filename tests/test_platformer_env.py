@@ -1,9 +1,17 @@
+import math
+import pickle
 import re
+import subprocess
+import sys
+from pathlib import Path
 
 import numpy as np
 import pytest
 
+from gym_platformer.core import generate_level_pack, write_chunk_file
+from gym_platformer.core.chunks import chunks
 from gym_platformer.envs import PlatformerEnv
+from gym_platformer.utils import custom_score
 
 
 def test_step() -> None:
@@ -50,3 +58,505 @@ def test_render() -> None:
     assert view.shape[2] == 3
     with pytest.raises(ValueError):
         env.render(mode="random_mode")
+
+
+def test_long_episode() -> None:
+    env = PlatformerEnv(ep_duration=float("inf"))
+    env.cfg.RANDOM_GEN = True
+    env.reset(seed=0)
+    sizes = []
+    for _ in range(200):
+        # flies to the right above the level
+        env.player.rect.y = 0
+        env.player.y_speed = 0.0
+        _, _, done, _, _ = env.step(1)
+        assert not done
+        sizes.append(len(env.map.live_chunks))
+    assert env.map.ends_dropped >= 5
+    assert max(sizes) <= 6
+
+
+@pytest.mark.parametrize(
+    ("obs_mode", "key"), [("image", "image"), ("grid", "grid"), ("state", None)]
+)
+def test_obs_mode(obs_mode: str, key: str | None) -> None:
+    env = PlatformerEnv(obs_mode=obs_mode)
+    observation, _ = env.reset()
+    for _ in range(5):
+        assert env.observation_space.contains(observation)
+        assert set(observation) == {key, "player_pos_x", "player_pos_y", "player_vel"} - {None}
+        observation, _, _, _, _ = env.step(3)
+    if obs_mode == "grid":
+        # the player stands above the ground of the first chunk
+        assert observation["grid"][-1, env.cfg.GRID_VIEW_BEHIND] == 1
+    with pytest.raises(ValueError):
+        PlatformerEnv(obs_mode="random_mode")
+    if obs_mode != "image":
+        # no frame is drawn, so no full size buffer is allocated
+        assert env.rasterizer._frame is None
+        assert env.rasterizer._background is None
+        assert env._image_indexes is None
+
+
+@pytest.mark.parametrize(
+    ("image_color", "shape"), [("rgb", (84, 84, 3)), ("grayscale", (84, 84)), ("palette", (84, 84))]
+)
+def test_image_color(image_color: str, shape: tuple[int, ...]) -> None:
+    env = PlatformerEnv(image_size=(84, 84), image_color=image_color)
+    observation, _ = env.reset()
+    for _ in range(5):
+        assert observation["image"].shape == shape
+        assert env.observation_space.contains(observation)
+        observation, _, _, _, _ = env.step(3)
+    if image_color == "palette":
+        np.testing.assert_array_equal(np.unique(observation["image"]), [0, 1, 2])
+    with pytest.raises(ValueError):
+        PlatformerEnv(image_color="random_color")
+
+
+def test_obs_buffers() -> None:
+    env = PlatformerEnv(image_size=(84, 84), copy_obs=False)
+    observation, _ = env.reset()
+    next_observation, _, _, _, _ = env.step(3)
+    for key, value in next_observation.items():
+        assert value is env.obs_buffers[key]
+        assert value is observation[key]
+
+    batch = {
+        key: np.zeros((2, *space.shape), space.dtype)
+        for key, space in env.observation_space.items()
+    }
+    env.set_obs_buffers({key: value[1] for key, value in batch.items()})
+    observation, _, _, _, _ = env.step(3)
+    assert observation["player_pos_x"] is not next_observation["player_pos_x"]
+    for key, value in observation.items():
+        np.testing.assert_array_equal(batch[key][1], value)
+        np.testing.assert_array_equal(batch[key][0], 0)
+
+    env.copy_obs = True
+    copied, _, _, _, _ = env.step(3)
+    assert not np.shares_memory(copied["image"], batch["image"])
+    with pytest.raises(ValueError):
+        env.set_obs_buffers({"image": batch["image"][0]})
+    with pytest.raises(ValueError):
+        env.set_obs_buffers({key: value[0].astype(np.float64) for key, value in batch.items()})
+
+
+@pytest.mark.parametrize("check_obs", [False, True])
+def test_out_of_window(check_obs: bool) -> None:
+    env = PlatformerEnv(obs_mode="state", check_obs=check_obs)
+    env.reset()
+    _, _, terminated, _, _ = env.step(5)
+    assert not terminated
+    env.player.rect.y = env.cfg.SIZE_Y
+    observation, _, terminated, _, _ = env.step(5)
+    assert terminated
+    assert not env.observation_space.contains(observation)
+
+
+def test_reset_snapshot() -> None:
+    env = PlatformerEnv(ep_duration=100, image_size=(84, 84), copy_obs=False)
+    first_observation = {key: value.copy() for key, value in env.reset()[0].items()}
+    first_map_state = env.map.get_state()
+    player = env.player
+    for _ in range(60):
+        env.step(3)
+    assert env.map.camera.x > 0
+
+    observation, info = env.reset()
+    assert env.player is player
+    assert env.player.rect.topleft == (env.cfg.START_X, env.cfg.START_Y)
+    assert env.map.get_state() == first_map_state
+    assert info == {"time": 0, "completion": 0.0, "score": 0.0}
+    for key, value in first_observation.items():
+        np.testing.assert_array_equal(observation[key], value)
+    env.step(3)
+    np.testing.assert_array_equal(env.obs_buffers["image"], env._get_obs()["image"])
+
+
+def test_clone_state() -> None:
+    rng = np.random.default_rng(0)
+    env = PlatformerEnv(ep_duration=100, obs_mode="grid", record_actions=True)
+    env.reset()
+    for _ in range(30):
+        env.step(3)
+    state = env.clone_state()
+    assert pickle.loads(pickle.dumps(state)) == state  # noqa: S301
+    with pytest.raises(AttributeError):
+        state.time_val = 0  # type: ignore[misc]
+
+    actions = rng.choice(6, size=40, p=[0.05, 0.45, 0.05, 0.35, 0.05, 0.05])
+    trajectories = []
+    for _ in range(2):
+        env.restore_state(state)
+        trajectory = [env.step(int(action)) for action in actions]
+        trajectories.append(trajectory)
+    for first, second in zip(*trajectories, strict=True):
+        for key, value in first[0].items():
+            np.testing.assert_array_equal(second[0][key], value)
+        assert first[1:] == second[1:]
+    assert env.clone_state() != state
+    assert env.clone_state().map_state.live_chunks[-1].layout is env.map.live_chunks[-1].layout
+
+    # the log goes back to the state, whichever branch was played after it
+    log = env.episode_log()
+    env.restore_state(state)
+    env.step(0)
+    assert env.episode_log().actions == log.actions[:30] + bytes([0])
+    env.reset()
+    env.restore_state(state)
+    with pytest.raises(ValueError):
+        env.episode_log()
+
+
+@pytest.mark.parametrize("copy_obs", [True, False])
+def test_clone_state_frame_stack(copy_obs: bool) -> None:
+    env = PlatformerEnv(ep_duration=100, obs_mode="grid", frame_stack=3, copy_obs=copy_obs)
+    env.reset(seed=0)
+    for _ in range(10):
+        env.step(3)
+    state = env.clone_state()
+    assert pickle.loads(pickle.dumps(state)) == state  # noqa: S301
+    expected = {key: value.copy() for key, value in env.step(1)[0].items()}
+    for _ in range(30):
+        env.step(3)
+    env.restore_state(state)
+    observation, *_ = env.step(1)
+    for key, value in expected.items():
+        np.testing.assert_array_equal(observation[key], value)
+
+
+def test_simulate() -> None:
+    rng = np.random.default_rng(0)
+    env = PlatformerEnv(ep_duration=90, obs_mode="state")
+    env.reset()
+    for _ in range(30):
+        env.step(3)
+    state = env.clone_state()
+    action_batch = rng.choice(6, size=(16, 70), p=[0.1, 0.35, 0.05, 0.35, 0.1, 0.05])
+    rewards, terminations, final = env.simulate(action_batch)
+    assert env.clone_state() == state
+    assert terminations[:, -1].all()
+    assert not terminations[:, 0].any()
+
+    for k, actions in enumerate(action_batch):
+        env.restore_state(state)
+        for t, action in enumerate(actions):
+            observation, reward, terminated, _, _ = env.step(int(action))
+            assert rewards[k, t] == reward
+            assert terminations[k, t] == terminated
+            if terminated:
+                break
+        np.testing.assert_array_equal(rewards[k, t + 1 :], 0.0)
+        for key, value in final.items():
+            np.testing.assert_array_equal(value[k], observation[key])
+
+    # a score function of scalars is called rollout by rollout
+    def scalar_score(time: float, completion: float, x: int) -> float:
+        return custom_score(time, completion, x) if completion >= 0 else 0.0
+
+    env.score_fct = scalar_score
+    env.restore_state(state)
+    scalar_rewards, _, _ = env.simulate(action_batch)
+    np.testing.assert_allclose(scalar_rewards, rewards)
+    with pytest.raises(ValueError):
+        env.simulate(action_batch[0])
+    with pytest.raises(ValueError):
+        env.simulate(action_batch + 1)
+
+
+def test_profiling() -> None:
+    env = PlatformerEnv(obs_mode="state")
+    env.reset()
+    env.step(3)
+    assert env.stats() == {}
+    assert "update_speed" not in env.player.__dict__
+
+    env.set_profiling(True)
+    for _ in range(10):
+        env.step(3)
+    stats = env.stats()
+    assert set(stats) == {
+        "update_speed",
+        "update_coor",
+        "level_generation",
+        "render",
+        "score",
+        "termination",
+    }
+    for phase in stats.values():
+        assert phase["count"] == 10
+        assert sum(phase["histogram_us"].values()) == 10
+        assert phase["total_us"] == pytest.approx(10 * phase["mean_us"])
+
+    env.set_profiling(False)
+    env.step(3)
+    assert env.stats()["score"]["count"] == 10
+    assert "update_speed" not in env.player.__dict__
+    env.profiler.clear()
+    assert env.stats()["score"]["count"] == 0
+
+    env = PlatformerEnv(obs_mode="state", profile=True)
+    env.reset()
+    env.reset()
+    env.step(3)
+    assert env.stats()["update_coor"]["count"] == 1
+    assert env.stats()["render"]["count"] == 2
+
+    # turned off before the player exists
+    env = PlatformerEnv(obs_mode="state", profile=True)
+    env.set_profiling(False)
+    env.reset()
+    env.step(3)
+    assert "update_speed" not in env.player.__dict__
+    assert env.stats()["score"]["count"] == 0
+
+
+def test_levels(tmp_path: Path) -> None:
+    env = PlatformerEnv(obs_mode="state", levels="random")
+    env.reset(seed=3)
+    level = env.map.level
+    assert len(level) == env.map.NB_CHUNK == 15
+    env.reset()
+    assert env.map.level != level
+    env.reset(seed=3)
+    assert env.map.level == level
+    state = env.clone_state()
+    env.reset()
+    env.restore_state(state)
+    assert env.map.level == level
+
+    path = generate_level_pack(tmp_path / "pack.npz", 10, n_chunks=4, seed=0)
+    env = PlatformerEnv(obs_mode="state", levels=path)
+    env.reset(seed=0)
+    assert env.map.level in [env.levels.level(i) for i in range(10)]
+    assert env.map.NB_CHUNK == 4
+    assert PlatformerEnv(levels=env.levels).levels is env.levels
+
+
+def test_chunk_file(tmp_path: Path) -> None:
+    level = ["init", "chunk_3", "chunk_1"]
+    path = write_chunk_file(tmp_path / "chunks.bin", chunks, [level])
+    env = PlatformerEnv(obs_mode="grid", chunk_file=path)
+    reference = PlatformerEnv(obs_mode="grid")
+    reference.map.set_level(level)
+    reference.level_length = len(level)
+    observation, _ = env.reset(seed=0)
+    expected, _ = reference.reset(seed=0)
+    for action in [3] * 20:
+        assert all(np.array_equal(observation[k], expected[k]) for k in expected)
+        observation, _, terminated, _, _ = env.step(action)
+        expected, _, expected_terminated, _, _ = reference.step(action)
+        assert terminated == expected_terminated
+
+    env = PlatformerEnv(obs_mode="state", chunk_file=path, levels="random")
+    env.reset(seed=0)
+    assert len(env.map.level) == 3
+    assert all(name in chunks for name in env.map.level)
+
+
+def test_endless(tmp_path: Path) -> None:
+    # every chunk is flat, so running to the right never ends
+    flat = [" " * 10] * 15 + ["W" * 9 + "E"]
+    path = write_chunk_file(tmp_path / "flat.bin", {"init": flat, "flat": flat})
+    env = PlatformerEnv(
+        obs_mode="grid", ep_duration=float("inf"), chunk_file=path, endless=True, levels="random"
+    )
+    env.reset(seed=0)
+    assert math.isinf(env.map.NB_CHUNK)
+    for _ in range(2_000):
+        _, reward, terminated, _, info = env.step(1)
+        assert not terminated
+        assert reward >= 0
+        # the chunks seen by the camera, and the next one
+        assert len(env.map.live_chunks) <= env.cfg.SIZE_X // (10 * env.cfg.BLOCK_WIDTH) + 2
+    assert info["completion"] > env.level_length
+    assert info["completion"] == env.map.chunks_passed(env.player.rect.x + env.map.camera.x)
+
+    state = env.clone_state()
+    action_batch = np.array([[1] * 100, [3] * 100, [5] * 100])
+    rewards, terminations, _ = env.simulate(action_batch)
+    for k, actions in enumerate(action_batch):
+        env.restore_state(state)
+        for t, action in enumerate(actions):
+            _, reward, terminated, _, _ = env.step(int(action))
+            assert rewards[k, t] == reward
+            assert terminations[k, t] == terminated
+
+    # snapshots stay small, the pack and the chunk file being pickled as their paths
+    pack_path = generate_level_pack(tmp_path / "pack.npz", 10_000, seed=0, names=["init", "flat"])
+    for levels in ("random", pack_path):
+        env = PlatformerEnv(obs_mode="state", chunk_file=path, endless=True, levels=levels)
+        env.reset(seed=0)
+        state = env.clone_state()
+        assert len(pickle.dumps(state)) < 2000
+        env.restore_state(pickle.loads(pickle.dumps(state)))  # noqa: S301
+        assert [env.map.level[i] for i in range(50)] == [
+            state.map_state.level[i] for i in range(50)
+        ]
+
+    env = PlatformerEnv(obs_mode="state", endless=True)
+    fixed = env.map.level
+    env.reset(seed=0)
+    # the fixed level is repeated
+    assert [env.map.level[i] for i in range(30)] == [*fixed, *fixed[1:], fixed[1]]
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "random_gen"),
+    [
+        ({}, False),
+        ({"levels": "random", "copy_obs": False}, False),
+        ({"endless": True, "levels": "random"}, False),
+        ({"obs_mode": "grid"}, True),
+    ],
+)
+def test_replay(kwargs: dict, random_gen: bool) -> None:
+    rng = np.random.default_rng(0)
+    env = PlatformerEnv(ep_duration=300, record_actions=True, **kwargs)
+    env.cfg.RANDOM_GEN = random_gen
+    env.reset(seed=0)
+    env.reset()
+    observations, rewards, terminations = [], [], []
+    for action in rng.choice(6, size=300, p=[0.05, 0.45, 0.05, 0.35, 0.05, 0.05]).tolist():
+        observation, reward, terminated, _, _ = env.step(action)
+        observations.append({key: value.copy() for key, value in observation.items()})
+        rewards.append(reward)
+        terminations.append(terminated)
+        if terminated:
+            break
+    log = env.episode_log()
+    assert len(log.actions) == len(rewards)
+
+    replay_env = PlatformerEnv(ep_duration=300, record_actions=True, **kwargs)
+    replay_env.cfg.RANDOM_GEN = random_gen
+    timesteps = [1, len(rewards) // 2, len(rewards)]
+    replay_rewards, replay_terminations, replay_observations = replay_env.replay(log, timesteps)
+    np.testing.assert_array_equal(replay_rewards, rewards)
+    np.testing.assert_array_equal(replay_terminations, terminations)
+    assert sorted(replay_observations) == timesteps
+    for t in timesteps:
+        for key, value in observations[t - 1].items():
+            np.testing.assert_array_equal(replay_observations[t][key], value)
+    assert replay_env.episode_log() == log
+
+    with pytest.raises(ValueError):
+        PlatformerEnv(ep_duration=300, levels="random").replay(log._replace(level=("init",)))
+
+    # the actions are only logged when asked for
+    env = PlatformerEnv(ep_duration=300, **kwargs)
+    env.reset(seed=0)
+    env.step(1)
+    assert len(env._log_actions) == 0
+    with pytest.raises(ValueError):
+        env.episode_log()
+
+
+def test_frame_skip() -> None:
+    rng = np.random.default_rng(0)
+    env = PlatformerEnv(ep_duration=200, frame_skip=4, record_actions=True)
+    reference = PlatformerEnv(ep_duration=200)
+    env.reset(seed=0)
+    reference.reset(seed=0)
+    actions = rng.choice(6, size=60, p=[0.05, 0.45, 0.05, 0.35, 0.05, 0.05]).tolist()
+    for action in actions:
+        observation, reward, terminated, _, info = env.step(action)
+        expected_reward = 0.0
+        for _ in range(4):
+            expected, frame_reward, expected_terminated, _, expected_info = reference.step(action)
+            expected_reward += frame_reward
+            if expected_terminated:
+                break
+        assert reward == expected_reward
+        assert terminated == expected_terminated
+        assert info == expected_info
+        for key, value in expected.items():
+            np.testing.assert_array_equal(observation[key], value)
+        if terminated:
+            break
+    assert terminated
+    assert env.time_val == reference.time_val
+
+    env.reset(seed=1)
+    for _ in range(5):
+        env.step(3)
+    state = env.clone_state()
+    action_batch = rng.choice(6, size=(4, 40), p=[0.1, 0.35, 0.05, 0.35, 0.1, 0.05])
+    rewards, terminations, _ = env.simulate(action_batch)
+    for k, actions in enumerate(action_batch):
+        env.restore_state(state)
+        for t, action in enumerate(actions):
+            _, reward, terminated, _, _ = env.step(int(action))
+            assert rewards[k, t] == reward
+            assert terminations[k, t] == terminated
+            if terminated:
+                break
+    # the log goes back to the restored state
+    assert len(env.episode_log().actions) == 5 + t + 1
+    replay_rewards, _, _ = PlatformerEnv(ep_duration=200, frame_skip=4).replay(env.episode_log())
+    assert replay_rewards.sum() == pytest.approx(env.score_val)
+
+    with pytest.raises(ValueError):
+        PlatformerEnv(frame_skip=0)
+
+
+@pytest.mark.parametrize(
+    ("obs_mode", "copy_obs"), [("image", True), ("image", False), ("grid", False)]
+)
+def test_frame_stack(obs_mode: str, copy_obs: bool) -> None:
+    env = PlatformerEnv(
+        ep_duration=100,
+        obs_mode=obs_mode,
+        image_size=(40, 40),
+        frame_stack=3,
+        copy_obs=copy_obs,
+        record_actions=True,
+    )
+    reference = PlatformerEnv(ep_duration=100, obs_mode=obs_mode, image_size=(40, 40))
+    assert env.observation_space[obs_mode].shape == (
+        3,
+        *reference.observation_space[obs_mode].shape,
+    )
+    for seed in range(2):
+        observation, _ = env.reset(seed=seed)
+        expected, _ = reference.reset(seed=seed)
+        frames = [expected[obs_mode]] * 3
+        for t in range(12):
+            assert env.observation_space.contains(observation)
+            np.testing.assert_array_equal(observation[obs_mode], np.stack(frames))
+            if not copy_obs:
+                # a view of the ring buffer, nothing is concatenated
+                assert observation[obs_mode].base is env._frames
+            observation, *_ = env.step(t % 2 + 1)
+            expected, *_ = reference.step(t % 2 + 1)
+            frames = [*frames[1:], expected[obs_mode]]
+
+    # only the frames stacked in the observations asked for are drawn again
+    _, _, observations = PlatformerEnv(
+        ep_duration=100, obs_mode=obs_mode, image_size=(40, 40), frame_stack=3
+    ).replay(env.episode_log(), timesteps=[1, 12])
+    np.testing.assert_array_equal(observations[12][obs_mode], observation[obs_mode])
+    # the reset frame fills the stack
+    np.testing.assert_array_equal(observations[1][obs_mode][0], observations[1][obs_mode][1])
+
+    with pytest.raises(ValueError):
+        PlatformerEnv(obs_mode="state", frame_stack=2)
+    with pytest.raises(ValueError):
+        PlatformerEnv(frame_stack=0)
+
+
+def test_headless_import() -> None:
+    # pygame is only imported to show the game or to draw with it
+    code = (
+        "import sys\n"
+        "from gym_platformer.envs import PlatformerEnv\n"
+        "env = PlatformerEnv()\n"
+        "env.reset(seed=0)\n"
+        "env.step(1)\n"
+        "env.render(mode='rgb_array')\n"
+        "print('pygame' in sys.modules)"
+    )
+    output = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    ).stdout
+    assert output.strip() == "False"
@@ -0,0 +1,79 @@
+import gymnasium as gym
+import numpy as np
+import pytest
+
+from gym_platformer.envs import PlatformerEnv, PlatformerVectorEnv
+
+
+def test_step_matches_platformer_env() -> None:
+    num_envs = 4
+    rng = np.random.default_rng(0)
+    vec_env = PlatformerVectorEnv(num_envs=num_envs, ep_duration=60)
+    envs = [PlatformerEnv(ep_duration=60) for _ in range(num_envs)]
+    observations, infos = vec_env.reset(seed=0)
+    for env in envs:
+        env.reset()
+    done = np.zeros(num_envs, dtype=bool)
+
+    for _ in range(160):
+        # mostly runs and jumps to the right to go through the whole level
+        actions = rng.choice(6, size=num_envs, p=[0.1, 0.35, 0.05, 0.35, 0.1, 0.05])
+        observations, rewards, terminations, truncations, infos = vec_env.step(actions)
+        assert not truncations.any()
+        for i, env in enumerate(envs):
+            if done[i]:
+                observation, info = env.reset()
+                reward, terminated = 0.0, False
+            else:
+                observation, reward, terminated, _, info = env.step(int(actions[i]))
+            for key, value in vec_env.single_observation_space.items():
+                assert value.contains(observations[key][i])
+                np.testing.assert_array_equal(observations[key][i], observation[key])
+            assert rewards[i] == reward
+            assert terminations[i] == terminated
+            for key in ("time", "completion", "score"):
+                assert infos[key][i] == info[key]
+        done = terminations
+
+    assert (vec_env.player.offset > 0).any()
+
+
+def test_step() -> None:
+    vec_env = PlatformerVectorEnv(num_envs=3, ep_duration=2)
+    vec_env.reset()
+    with pytest.raises(ValueError):
+        vec_env.step(np.array([0, 1, 50]))
+    _, _, terminations, _, _ = vec_env.step(np.array([1, 1, 1]))
+    assert not terminations.any()
+    _, _, terminations, _, infos = vec_env.step(np.array([1, 1, 1]))
+    assert terminations.all()
+    np.testing.assert_array_equal(infos["time"], 2)
+    observations, rewards, terminations, _, infos = vec_env.step(np.array([1, 1, 1]))
+    assert not terminations.any()
+    np.testing.assert_array_equal(rewards, 0.0)
+    np.testing.assert_array_equal(infos["time"], 0)
+    np.testing.assert_array_equal(observations["player_pos_x"], vec_env.cfg.START_X)
+
+
+def test_make_vec() -> None:
+    envs = gym.make_vec("gym_platformer:platformer-state-v0", num_envs=4, ep_duration=10)
+    assert isinstance(envs.unwrapped, PlatformerVectorEnv)
+    assert (
+        envs.single_observation_space
+        == gym.make("gym_platformer:platformer-state-v0").observation_space
+    )
+    observations, _ = envs.reset(seed=1)
+    assert envs.observation_space.contains(observations)
+    envs.step(envs.action_space.sample())
+    envs.close()
+
+    # the default environment is vectorized with the observations of `gym.make`
+    envs = gym.make_vec("gym_platformer:platformer-v0", num_envs=2, obs_mode="grid")
+    assert not isinstance(envs.unwrapped, PlatformerVectorEnv)
+    assert (
+        envs.single_observation_space
+        == gym.make("gym_platformer:platformer-v0", obs_mode="grid").observation_space
+    )
+    envs.close()
+    with pytest.raises(ValueError):
+        PlatformerVectorEnv(obs_mode="image")
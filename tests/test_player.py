@@ -30,20 +30,20 @@ def test_step() -> None:
     ]
     map_obj.load_chunk(chunk_test, 0)
     # test vertical moves
-    player.step(4, map_obj.blocks)
+    player.step(4, map_obj)
     assert player.y_speed == -cfg.SPEED_Y
     assert player.x_speed == 0
     assert player.rect.x == cfg.START_X
     assert player.rect.y == cfg.START_Y - cfg.SPEED_Y
     for _ in range(20):
-        player.step(5, map_obj.blocks)
+        player.step(5, map_obj)
     # test horizontal moves
     player.x_speed = cfg.SPEED_X
-    player.step(1, map_obj.blocks)
+    player.step(1, map_obj)
     assert player.x_speed == cfg.SPEED_X
     assert player.rect.x == 48
     assert player.rect.y == 208
-    player.step(1, map_obj.blocks)
+    player.step(1, map_obj)
     assert player.x_speed < cfg.SPEED_X
     assert player.rect.x == 48
     assert player.rect.y == 208
@@ -0,0 +1,68 @@
+import numpy as np
+
+from gym_platformer.core import Configuration, Map, Player, Rasterizer
+from gym_platformer.envs import PlatformerEnv
+
+
+def draw_with_pygame(env: PlatformerEnv) -> np.ndarray:
+    env.render_backend = "pygame"
+    view = env.render(mode="rgb_array")
+    env.render_backend = "numpy"
+    return view
+
+
+def test_draw_matches_pygame() -> None:
+    rng = np.random.default_rng(0)
+    env = PlatformerEnv(ep_duration=float("inf"))
+    env.reset()
+    np.testing.assert_array_equal(env.render(mode="rgb_array"), draw_with_pygame(env))
+    for action in rng.choice(6, size=150, p=[0.05, 0.45, 0.05, 0.35, 0.05, 0.05]):
+        observation, _, _, _, _ = env.step(int(action))
+        assert np.array_equal(observation["image"], draw_with_pygame(env))
+    assert env.map.camera.x > 0
+
+
+def test_draw_overlapping_chunks() -> None:
+    env = PlatformerEnv()
+    env.reset()
+    chunk = [" " * 4] * (env.cfg.CHUNK_HEIGHT - 2) + ["W   ", "  W "]
+    env.map.load_chunk(chunk, env.cfg.START_X + env.cfg.BLOCK_WIDTH)
+    env.player.rect.y = -env.cfg.BLOCK_HEIGHT
+    np.testing.assert_array_equal(env.render(mode="rgb_array"), draw_with_pygame(env))
+
+
+def test_chunk_bitmap() -> None:
+    cfg = Configuration(chunk_height=2)
+    rasterizer = Rasterizer(cfg)
+    colors, mask = rasterizer.chunk_bitmap(("W ", " E"))
+    assert colors.shape == (2 * cfg.BLOCK_HEIGHT, 2 * cfg.BLOCK_WIDTH, 3)
+    np.testing.assert_array_equal(mask[[0, 0, -1], [0, -1, -1]], [True, False, True])
+    np.testing.assert_array_equal(colors[-1, -1], cfg.WHITE)
+    np.testing.assert_array_equal(colors[-1, 0], cfg.GREY)
+    assert rasterizer.chunk_bitmap(("W ", " E"))[0] is colors
+
+    map_obj = Map(cfg)
+    map_obj.load_chunk(["W ", " E"], 0)
+    frame = rasterizer.draw(map_obj, Player(cfg))
+    assert frame is rasterizer.frame
+    np.testing.assert_array_equal(frame[map_obj.grid_rect.bottom - 1, -1], cfg.GREY)
+    np.testing.assert_array_equal(
+        frame[map_obj.grid_rect.bottom - 1, 2 * cfg.BLOCK_WIDTH - 1], cfg.WHITE
+    )
+
+
+def test_draw_indexes_matches_full_frame() -> None:
+    rng = np.random.default_rng(1)
+    env = PlatformerEnv(ep_duration=float("inf"), image_size=(84, 84))
+    env.reset()
+    ys = (2 * np.arange(84) + 1) * env.cfg.SIZE_Y // 168
+    xs = (2 * np.arange(84) + 1) * env.cfg.SIZE_X // 168
+    for action in rng.choice(6, size=100, p=[0.05, 0.45, 0.05, 0.35, 0.05, 0.05]):
+        observation, _, _, _, _ = env.step(int(action))
+        frame = env.render(mode="rgb_array")
+        assert np.array_equal(observation["image"], frame[np.ix_(ys, xs)])
+    assert env.map.camera.x > 0
+
+    size = (env.cfg.SIZE_Y, env.cfg.SIZE_X)
+    indexes = env.rasterizer.draw_indexes(env.map, env.player, size)
+    assert np.array_equal(env.rasterizer.palette[indexes], env.render(mode="rgb_array"))
@@ -0,0 +1,26 @@
+import numpy as np
+import pygame
+
+from gym_platformer.core.rect import Rect
+
+
+def test_rect_matches_pygame() -> None:
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        values = rng.integers([-5, -5, 0, 0], [6, 6, 5, 5]).tolist()
+        other_values = rng.integers([-5, -5, 0, 0], [6, 6, 5, 5]).tolist()
+        rect, other = Rect(*values), Rect(*other_values)
+        expected, expected_other = pygame.Rect(values), pygame.Rect(other_values)
+        assert rect.colliderect(other) == expected.colliderect(expected_other)
+        if expected and expected_other:
+            # pygame clips empty rectangles in ways the game never needs
+            assert tuple(rect.clip(other)) == tuple(expected.clip(expected_other))
+        assert rect.move(3, -2) == tuple(expected.move(3, -2))
+        for side in ("left", "right", "top", "bottom"):
+            assert getattr(rect, side) == getattr(expected, side)
+            setattr(rect, side, 1)
+            setattr(expected, side, 1)
+            assert rect == tuple(expected)
+        assert rect.topleft == expected.topleft
+    # pygame functions take a `Rect` as the sequence of its values
+    assert pygame.Rect(Rect(1, 2, 3, 4)) == pygame.Rect(1, 2, 3, 4)
@@ -0,0 +1,85 @@
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from gym_platformer.envs import PlatformerEnv
+from gym_platformer.wrappers import TrajectoryReader, TrajectoryRecorder
+from gym_platformer.wrappers.trajectory_recorder import RESET_ACTION
+
+
+@pytest.mark.parametrize("images", ["raw", "compressed", "none"])
+def test_trajectory_recorder(tmp_path: Path, images: str) -> None:
+    env = TrajectoryRecorder(
+        PlatformerEnv(image_size=(36, 45)), tmp_path, chunk_size=16, images=images
+    )
+    rng = np.random.default_rng(0)
+    records = []
+    observation, _ = env.reset(seed=0)
+    records.append((observation, RESET_ACTION, 0.0, False))
+    for _ in range(70):
+        action = int(rng.integers(6))
+        observation, reward, terminated, _, _ = env.step(action)
+        records.append((observation, action, reward, terminated))
+        if terminated:
+            observation, _ = env.reset()
+            records.append((observation, RESET_ACTION, 0.0, False))
+    env.close()
+
+    reader = TrajectoryReader(tmp_path)
+    assert len(reader) == len(records)
+    assert len(reader.chunks) == -(-len(records) // 16)
+    assert ("image" in reader.keys) == (images != "none")
+    for index in (0, 15, 16, 33, -1):
+        observation, action, reward, terminated = records[index]
+        record = reader[index]
+        assert record["action"] == action
+        assert record["reward"] == reward
+        assert record["terminated"] == terminated
+        for key, value in observation.items():
+            if key in reader.keys:
+                np.testing.assert_array_equal(record[key], value)
+    with pytest.raises(IndexError):
+        reader[len(records)]
+
+    batch = reader.sample(32, np.random.default_rng(0))
+    assert (batch["action"] != RESET_ACTION).all()
+    assert batch["player_pos_x"].shape == (32, 1)
+    if images != "none":
+        assert batch["previous_image"].shape == (32, 36, 45, 3)
+    for i in range(32):
+        index = next(
+            k
+            for k, (observation, *_) in enumerate(records)
+            if records[k][1] != RESET_ACTION
+            and np.array_equal(observation["player_pos_x"], batch["player_pos_x"][i])
+            and np.array_equal(records[k - 1][0]["player_vel"], batch["previous_player_vel"][i])
+        )
+        assert records[index][1] == batch["action"][i]
+
+
+@pytest.mark.parametrize("images", ["raw", "compressed"])
+def test_trajectory_recorder_memory(tmp_path: Path, images: str) -> None:
+    # full size images, far more than a chunk of them fits in `chunk_bytes`
+    chunk_bytes = 2**22
+    env = TrajectoryRecorder(PlatformerEnv(), tmp_path, chunk_bytes=chunk_bytes, images=images)
+    tracemalloc.start()
+    env.reset(seed=0)
+    for _ in range(300):
+        _, _, terminated, _, _ = env.step(1)
+        if terminated:
+            env.reset()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    env.close()
+    # the chunk being gathered and the ones waiting for the writer
+    assert memory < 6 * chunk_bytes
+    assert len(TrajectoryReader(tmp_path)) > 300
+
+
+def test_trajectory_recorder_invalid(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        TrajectoryRecorder(PlatformerEnv(), tmp_path, images="png")
+    with pytest.raises(ValueError):
+        TrajectoryReader(tmp_path)